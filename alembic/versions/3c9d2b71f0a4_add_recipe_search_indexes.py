@@ -0,0 +1,61 @@
+"""Add recipe search indexes
+
+Full-text search vector over title and steps, trigram index on title and
+a GIN index on the ingredients array.
+
+Revision ID: 3c9d2b71f0a4
+Revises: 96b18f72a38f
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9d2b71f0a4'
+down_revision: Union[str, Sequence[str], None] = '96b18f72a38f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SEARCH_DOCUMENT = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(steps, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Generated column, so Postgres keeps it up to date on every insert/update
+    op.execute(
+        "ALTER TABLE recipes ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        f"GENERATED ALWAYS AS ({SEARCH_DOCUMENT}) STORED"
+    )
+
+    # Build the indexes without locking the table against writes
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_recipes_search_vector "
+            "ON recipes USING gin (search_vector)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_recipes_title_trgm "
+            "ON recipes USING gin (title gin_trgm_ops)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_recipes_ingredients "
+            "ON recipes USING gin (ingredients)"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS ix_recipes_ingredients")
+    op.execute("DROP INDEX IF EXISTS ix_recipes_title_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_recipes_search_vector")
+    op.execute("ALTER TABLE recipes DROP COLUMN IF EXISTS search_vector")
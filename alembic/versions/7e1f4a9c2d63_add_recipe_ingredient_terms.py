@@ -0,0 +1,68 @@
+"""Add recipe ingredient terms
+
+Normalized ingredient vocabulary per recipe, GIN indexed for the
+/recipes/match endpoint and ingredient search. Replaces the GIN index on
+the raw ingredients array, which nothing queries anymore.
+
+Revision ID: 7e1f4a9c2d63
+Revises: 3c9d2b71f0a4
+Create Date: 2026-10-18 11:03:27.554019
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from backend.ingredients import ingredient_terms
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e1f4a9c2d63'
+down_revision: Union[str, Sequence[str], None] = '3c9d2b71f0a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        "ALTER TABLE recipes ADD COLUMN IF NOT EXISTS ingredient_terms "
+        "VARCHAR[] NOT NULL DEFAULT '{}'"
+    )
+
+    # Backfill in id order, one batch at a time
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.text(
+                "SELECT id, ingredients FROM recipes WHERE id > :last_id "
+                "ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).fetchall()
+        if not rows:
+            break
+
+        conn.execute(
+            sa.text("UPDATE recipes SET ingredient_terms = :terms WHERE id = :id"),
+            [{"id": row.id, "terms": ingredient_terms(row.ingredients)} for row in rows],
+        )
+        last_id = rows[-1].id
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_recipes_ingredient_terms "
+            "ON recipes USING gin (ingredient_terms)"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_recipes_ingredients")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("CREATE INDEX IF NOT EXISTS ix_recipes_ingredients ON recipes USING gin (ingredients)")
+    op.execute("DROP INDEX IF EXISTS ix_recipes_ingredient_terms")
+    op.execute("ALTER TABLE recipes DROP COLUMN IF EXISTS ingredient_terms")
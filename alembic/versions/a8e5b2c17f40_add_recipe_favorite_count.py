@@ -0,0 +1,44 @@
+"""Add recipe favorite_count
+
+Denormalized number of favorites per recipe, backfilled from favorites, and
+the (favorite_count, id) index that /recipes/popular reads backwards.
+
+Revision ID: a8e5b2c17f40
+Revises: f1c3a7d92e05
+Create Date: 2026-10-18 16:58:37.220461
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8e5b2c17f40'
+down_revision: Union[str, Sequence[str], None] = 'f1c3a7d92e05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("ALTER TABLE recipes ADD COLUMN IF NOT EXISTS favorite_count INTEGER NOT NULL DEFAULT 0")
+    # Only recipes that have favorites need a write
+    op.execute(
+        "UPDATE recipes r SET favorite_count = c.n "
+        "FROM (SELECT recipe_id, count(*) AS n FROM favorites GROUP BY recipe_id) c "
+        "WHERE r.id = c.recipe_id"
+    )
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_recipes_popular "
+            "ON recipes (favorite_count, id)"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS ix_recipes_popular")
+    op.drop_column('recipes', 'favorite_count')
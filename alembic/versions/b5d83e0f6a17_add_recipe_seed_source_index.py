@@ -0,0 +1,58 @@
+"""Add recipe seed source index
+
+Unique (image_url, title) for dataset rows (created_by IS NULL), so the bulk
+seed loader can insert with ON CONFLICT DO NOTHING and be re-run safely.
+
+Revision ID: b5d83e0f6a17
+Revises: 7e1f4a9c2d63
+Create Date: 2026-10-18 13:41:09.337512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d83e0f6a17'
+down_revision: Union[str, Sequence[str], None] = '7e1f4a9c2d63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The old loader could insert the dataset twice; keep the first copy of each row.
+    # Favorites on a duplicate move to the kept copy first (deleting the
+    # duplicate would cascade to them), then pairs that now appear twice are
+    # dropped. favorite_count doesn't exist yet; its migration backfills it.
+    op.execute("""
+        UPDATE favorites f SET recipe_id = dup.keep_id
+        FROM (
+            SELECT id, min(id) OVER (PARTITION BY image_url, title) AS keep_id
+            FROM recipes
+            WHERE created_by IS NULL AND image_url IS NOT NULL
+        ) dup
+        WHERE f.recipe_id = dup.id AND dup.id <> dup.keep_id
+    """)
+    op.execute("""
+        DELETE FROM favorites f USING favorites other
+        WHERE f.user_id = other.user_id AND f.recipe_id = other.recipe_id AND f.id > other.id
+    """)
+    op.execute(
+        "DELETE FROM recipes r USING recipes keep "
+        "WHERE r.created_by IS NULL AND keep.created_by IS NULL "
+        "AND r.image_url = keep.image_url AND r.title = keep.title AND r.id > keep.id"
+    )
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ux_recipes_seed_source "
+            "ON recipes (image_url, title) WHERE created_by IS NULL"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS ux_recipes_seed_source")
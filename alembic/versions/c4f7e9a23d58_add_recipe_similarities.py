@@ -0,0 +1,50 @@
+"""Add recipe similarities
+
+Precomputed top-k similar recipes per recipe and the ingredient term IDF
+table they were computed with (see backend/recommendations.py). Filled by
+python -m backend.recommendations.
+
+Revision ID: c4f7e9a23d58
+Revises: a8e5b2c17f40
+Create Date: 2026-10-18 17:45:02.671580
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4f7e9a23d58'
+down_revision: Union[str, Sequence[str], None] = 'a8e5b2c17f40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'recipe_similarities',
+        sa.Column('recipe_id', sa.Integer(), sa.ForeignKey('recipes.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('similar_id', sa.Integer(), sa.ForeignKey('recipes.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('score', sa.Float(), nullable=False),
+    )
+    op.create_index('ix_recipe_similarities_score', 'recipe_similarities',
+                    ['recipe_id', sa.text('score DESC')])
+    op.create_index('ix_recipe_similarities_similar_id', 'recipe_similarities', ['similar_id'])
+
+    op.create_table(
+        'recipe_term_idf',
+        sa.Column('term', sa.String(), primary_key=True),
+        sa.Column('df', sa.Integer(), nullable=False),
+        sa.Column('idf', sa.Float(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('recipe_term_idf')
+    op.drop_index('ix_recipe_similarities_similar_id', table_name='recipe_similarities')
+    op.drop_index('ix_recipe_similarities_score', table_name='recipe_similarities')
+    op.drop_table('recipe_similarities')
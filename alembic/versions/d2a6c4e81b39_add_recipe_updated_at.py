@@ -0,0 +1,34 @@
+"""Add recipe updated_at
+
+Row version used to build ETags for the recipe endpoints. The default is
+evaluated once by ALTER TABLE, so existing rows are not rewritten.
+
+Revision ID: d2a6c4e81b39
+Revises: b5d83e0f6a17
+Create Date: 2026-10-18 15:02:44.518730
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a6c4e81b39'
+down_revision: Union[str, Sequence[str], None] = 'b5d83e0f6a17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        "ALTER TABLE recipes ADD COLUMN IF NOT EXISTS updated_at "
+        "TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('recipes', 'updated_at')
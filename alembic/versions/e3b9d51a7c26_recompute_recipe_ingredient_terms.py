@@ -0,0 +1,59 @@
+"""Recompute recipe ingredient terms
+
+Possessives ("baker's") and staple phrases ("black pepper") are normalized
+differently now; rewrite the stored terms so they match what pantry and
+search input normalizes to. Re-run python -m backend.recommendations
+afterwards to refresh the similarities built on the old terms.
+
+Revision ID: e3b9d51a7c26
+Revises: c4f7e9a23d58
+Create Date: 2026-10-18 19:12:40.208113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from backend.ingredients import ingredient_terms
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b9d51a7c26'
+down_revision: Union[str, Sequence[str], None] = 'c4f7e9a23d58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Same batched pass as the original backfill; only rows whose terms change are written
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.text(
+                "SELECT id, ingredients, ingredient_terms FROM recipes WHERE id > :last_id "
+                "ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).fetchall()
+        if not rows:
+            break
+
+        changed = []
+        for row in rows:
+            terms = ingredient_terms(row.ingredients)
+            if terms != list(row.ingredient_terms or []):
+                changed.append({"id": row.id, "terms": terms})
+        if changed:
+            conn.execute(sa.text("UPDATE recipes SET ingredient_terms = :terms WHERE id = :id"), changed)
+        last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The old terms aren't kept; the new ones work with the previous code as well
+    pass
@@ -0,0 +1,53 @@
+"""Add favorites and recipe lookup indexes
+
+Unique (user_id, recipe_id) on favorites (backs the favorite upsert and every
+"is this a favorite" probe), recipe_id on favorites (cascade deletes, counts),
+and title / created_by on recipes (duplicate-title check, a user's recipes).
+/recipes is ordered by id, which the primary key already covers; /favorites
+walks ux_favorites_user_recipe in recipe_id order.
+
+Revision ID: f1c3a7d92e05
+Revises: d2a6c4e81b39
+Create Date: 2026-10-18 16:20:13.904127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c3a7d92e05'
+down_revision: Union[str, Sequence[str], None] = 'd2a6c4e81b39'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("ux_favorites_user_recipe", "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ux_favorites_user_recipe "
+                                 "ON favorites (user_id, recipe_id)"),
+    ("ix_favorites_recipe_id", "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_favorites_recipe_id "
+                               "ON favorites (recipe_id)"),
+    ("ix_recipes_title", "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_recipes_title ON recipes (title)"),
+    ("ix_recipes_created_by", "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_recipes_created_by "
+                              "ON recipes (created_by)"),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The old check-then-insert could store the same favorite twice; keep the first
+    op.execute(
+        "DELETE FROM favorites f USING favorites keep "
+        "WHERE f.user_id = keep.user_id AND f.recipe_id = keep.recipe_id AND f.id > keep.id"
+    )
+
+    with op.get_context().autocommit_block():
+        for _, statement in INDEXES:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, _ in reversed(INDEXES):
+        op.execute(f"DROP INDEX IF EXISTS {name}")
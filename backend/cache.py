@@ -0,0 +1,155 @@
+# backend/cache.py
+# Small caching layer: TTL + LRU eviction, pluggable storage and single-flight
+#
+# Storage backends:
+#   - MemoryBackend: in-process, bounded LRU (default)
+#   - RedisBackend: shared between workers/hosts, enabled with a redis:// URL
+#     (needs the optional `redis` package)
+
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional
+
+
+class MemoryBackend:
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)  # most recently used
+            return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)  # least recently used
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisBackend:
+    # Values are stored as JSON, so only cache JSON-serializable data here
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("A redis:// cache URL needs the `redis` package (pip install redis)")
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self.client.get(key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self.client.set(key, json.dumps(value), ex=max(int(ttl), 1))
+
+    def delete(self, key: str) -> None:
+        self.client.delete(key)
+
+
+def make_backend(url: Optional[str], max_entries: int = 1024):
+    if not url:
+        return MemoryBackend(max_entries)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(url)
+    raise ValueError(f"Unsupported cache URL: {url}")
+
+
+class Cache:
+    def __init__(self, name: str, backend, ttl: float):
+        self.name = name
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0  # callers that waited on another caller's computation
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    def _key(self, key: str) -> str:
+        return f"{self.name}:{key}"
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.backend.get(self._key(key))
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self.backend.set(self._key(key), value, self.ttl)
+
+    def delete(self, key: str) -> None:
+        self.backend.delete(self._key(key))
+
+    # Deletes the entry, and the one an in-flight aget_or_compute() is about to
+    # store (it may have read the data before the change being invalidated).
+    # Safe to call from threadpool routes.
+    def invalidate(self, key: str) -> None:
+        self.delete(key)
+        task = self._tasks.get(key)
+        if task is not None:
+            task.get_loop().call_soon_threadsafe(task.add_done_callback, lambda t: self.delete(key))
+
+    # Returns the cached value, or computes it once no matter how many callers
+    # ask for the same key at the same time (single-flight). The computation
+    # runs as its own task, so a caller that disconnects doesn't cancel it for
+    # the others waiting on the same key.
+    async def aget_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._compute_and_set(key, compute))
+            self._tasks[key] = task
+            task.add_done_callback(lambda t: self._finish_task(key, t))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    async def _compute_and_set(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        value = await compute()
+        self.set(key, value)
+        return value
+
+    def _finish_task(self, key: str, task: asyncio.Task) -> None:
+        self._tasks.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # mark as retrieved even if every caller went away
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        stats = {
+            "name": self.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "ttl_seconds": self.ttl,
+        }
+        if isinstance(self.backend, MemoryBackend):
+            stats["entries"] = len(self.backend)
+            stats["max_entries"] = self.backend.max_entries
+        return stats
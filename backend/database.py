@@ -2,10 +2,15 @@
 # Sets up the database connection and manages how the app connects with the app
 # app/database.py
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from dotenv import load_dotenv
 import os
+import threading
+import time
 
 load_dotenv()  # loads variables from .env
 
@@ -17,12 +22,144 @@ DATABASE_URL = (
     f"{os.getenv('POSTGRES_DB')}"
 )
 
+# Same database through asyncpg, for the async routes
+ASYNC_DATABASE_URL = DATABASE_URL.replace("postgresql+psycopg2://", "postgresql+asyncpg://", 1)
+
+
+def env_flag(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).strip().lower() in ("1", "true", "yes", "on")
+
+
+# Pool settings (see .env.example)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))      # seconds to wait for a connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))      # seconds before a connection is replaced
+DB_POOL_PRE_PING = env_flag("DB_POOL_PRE_PING", True)
+DB_ECHO = env_flag("DB_ECHO", False)                             # log every SQL statement
+
+
+# Pool usage counters, fed by the pool class and pool events below
+class PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidated = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.peak_checked_out = 0
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+
+    def record_checked_out(self, checked_out: int) -> None:
+        with self._lock:
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+
+# Pool mixin that measures how long each checkout waited for a free connection
+class InstrumentedPoolMixin:
+    stats: PoolStats = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        self.stats.record_wait(time.perf_counter() - started)
+        self.stats.record_checked_out(self.checkedout())
+        return connection
+
+    # engine.dispose() replaces the pool; keep counting into the same stats
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def instrument_pool(engine, stats: PoolStats) -> None:
+    pool = engine.pool
+    pool.stats = stats
+
+    @event.listens_for(pool, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        stats.connects += 1
+
+    @event.listens_for(pool, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        stats.invalidated += 1
+
+
+# Current state of a pool plus the counters collected since startup
+def pool_status(engine, stats: PoolStats) -> dict:
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "max_overflow": DB_MAX_OVERFLOW,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),  # connections opened beyond pool_size
+        "peak_checked_out": stats.peak_checked_out,
+        "checkouts": stats.checkouts,
+        "timeouts": stats.timeouts,
+        "connects": stats.connects,
+        "invalidated": stats.invalidated,
+        "wait_seconds_total": round(stats.wait_seconds_total, 6),
+        "wait_seconds_max": round(stats.wait_seconds_max, 6),
+        "wait_seconds_avg": round(stats.wait_seconds_total / stats.checkouts, 6) if stats.checkouts else 0.0,
+    }
+
+
 # Create the engine
 # bridge between SQL Alchemy and the actual database
-engine = create_engine(DATABASE_URL, echo=True)  # echo=True = logs SQL queries
+engine = create_engine(
+    DATABASE_URL,
+    echo=DB_ECHO,
+    poolclass=InstrumentedQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+)
+pool_stats = PoolStats()
+instrument_pool(engine, pool_stats)
+
+# Async engine with the same pool settings (its own pool of connections)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    echo=DB_ECHO,
+    poolclass=InstrumentedAsyncQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+)
+async_pool_stats = PoolStats()
+instrument_pool(async_engine.sync_engine, async_pool_stats)
 
 # Create a session
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 # Base class for models
 Base = declarative_base()
@@ -36,3 +173,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Dependency for async FastAPI routes
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,81 @@
+# backend/http_cache.py
+# HTTP caching: ETags, conditional GETs (304) and Cache-Control
+#
+# Images under /images are named by their content hash, so they are cached
+# for a year as immutable. API responses are per user, so they are cached
+# privately and revalidated on every use: the client sends If-None-Match and
+# gets an empty 304 when the ETag still matches. Routes compute the ETag from
+# row versions (id, updated_at), never from the serialized body, so a 304
+# skips loading and serializing the full rows.
+
+import hashlib
+import json
+import os
+import re
+from typing import Optional
+
+from fastapi import Request, Response
+from fastapi.staticfiles import StaticFiles
+from sqlalchemy.orm import load_only
+
+# Bump when the shape of API responses changes, so old ETags stop matching
+REPRESENTATION_VERSION = 1
+
+API_CACHE_CONTROL = "private, no-cache"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+IMAGE_MAX_AGE = int(os.getenv("IMAGE_MAX_AGE", "86400"))  # images that aren't content-addressed
+
+CONTENT_HASH_NAME = re.compile(r"^[0-9a-f]{64}\.")
+
+
+# ETag from the values a response is built from. Weak, because the same tag
+# labels the identity, gzip and brotli bodies (backend/compression.py): they
+# are the same data, not the same bytes.
+def make_etag(*parts) -> str:
+    raw = json.dumps([REPRESENTATION_VERSION, *parts], default=str, separators=(",", ":"))
+    return 'W/"' + hashlib.sha256(raw.encode()).hexdigest()[:32] + '"'
+
+
+# Query option that loads just enough of each row to build its ETag
+def version_only(model):
+    return load_only(model.id, model.updated_at)
+
+
+def rows_etag(rows, *parts) -> str:
+    return make_etag([(r.id, r.updated_at.isoformat()) for r in rows], *parts)
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    etag = etag.removeprefix("W/")
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+def cache_headers(etag: str, cache_control: str = API_CACHE_CONTROL) -> dict:
+    return {"ETag": etag, "Cache-Control": cache_control, "Vary": "Authorization"}
+
+
+# The 304 to send instead of the body when the client already has this version
+def conditional(request: Request, etag: str, cache_control: str = API_CACHE_CONTROL) -> Optional[Response]:
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=cache_headers(etag, cache_control))
+    return None
+
+
+def image_cache_control(filename: str) -> str:
+    if CONTENT_HASH_NAME.match(filename):
+        return IMMUTABLE_CACHE_CONTROL
+    return f"public, max-age={IMAGE_MAX_AGE}"
+
+
+# StaticFiles already handles ETag/If-None-Match; this adds Cache-Control
+class CachedStaticFiles(StaticFiles):
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        response.headers["Cache-Control"] = image_cache_control(os.path.basename(full_path))
+        return response
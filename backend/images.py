@@ -0,0 +1,190 @@
+# backend/images.py
+# Resized image variants (thumbnails) for recipe cards
+#
+# Every image under /images gets WebP and JPEG variants at a few widths,
+# stored on disk under Food_Images/variants/<width>/<name>.<format> and served
+# at /images/w/<width>/<name>.<format>. Variants are generated in a
+# background process pool when an image is uploaded or the dataset is seeded,
+# and lazily on first request for anything still missing. An image that can't
+# be resized (corrupt, a decompression bomb, a worker that died on it) is
+# served as the original instead, and a broken pool is replaced.
+#
+#   python -m backend.images      (generate variants for every stored image)
+
+import asyncio
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from PIL import Image, ImageOps
+
+from backend.uploads import IMAGE_DIR
+
+VARIANT_DIR = os.path.join('backend', 'data', 'Food_Images', 'variants')
+VARIANT_WIDTHS = (160, 320, 640)
+VARIANT_FORMATS = {"webp": ("WEBP", 75), "jpg": ("JPEG", 80)}  # format -> (PIL format, quality)
+SOURCE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".gif")
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+
+# Raised by generate_variant for an image that can't be resized
+IMAGE_ERRORS = (OSError, Image.DecompressionBombError)
+
+_pool: Optional[ProcessPoolExecutor] = None
+_inflight: dict[str, asyncio.Future] = {}
+
+
+def pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: don't fork a process that is running an event loop and DB pools
+        _pool = ProcessPoolExecutor(IMAGE_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def shutdown() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+# A worker that dies (OOM, a crash in a decoder) breaks the whole executor for
+# good and it has already terminated its processes; drop it so the next job
+# starts a fresh one
+def _discard_pool(broken: ProcessPoolExecutor) -> None:
+    global _pool
+    if _pool is broken:
+        _pool = None
+
+
+def submit(fn, *args) -> Future:
+    executor = pool()
+    try:
+        job = executor.submit(fn, *args)
+    except BrokenProcessPool:
+        _discard_pool(executor)
+        executor = pool()
+        job = executor.submit(fn, *args)
+
+    def discard_if_broken(done: Future) -> None:
+        if not done.cancelled() and isinstance(done.exception(), BrokenProcessPool):
+            _discard_pool(executor)
+
+    job.add_done_callback(discard_if_broken)
+    return job
+
+
+# /images/w/320/abc.webp style URLs for an /images/abc.jpg image (WebP; .jpg works too)
+def variant_urls(image_url: Optional[str]) -> Optional[dict[str, str]]:
+    if not image_url or not image_url.startswith("/images/"):
+        return None
+    stem = os.path.splitext(image_url[len("/images/"):])[0]
+    return {str(width): f"/images/w/{width}/{stem}.webp" for width in VARIANT_WIDTHS}
+
+
+def variant_path(width: int, stem: str, fmt: str) -> str:
+    return os.path.join(VARIANT_DIR, str(width), f"{stem}.{fmt}")
+
+
+def source_path(stem: str) -> Optional[str]:
+    for ext in SOURCE_EXTENSIONS:
+        path = os.path.join(IMAGE_DIR, stem + ext)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+# Runs in a worker process. Downscale only, written atomically.
+def generate_variant(source: str, width: int, fmt: str, target: str) -> str:
+    pil_format, quality = VARIANT_FORMATS[fmt]
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+
+    with Image.open(source) as img:
+        img = ImageOps.exif_transpose(img).convert("RGB")
+        if img.width > width:
+            img = img.resize((width, round(img.height * width / img.width)), Image.LANCZOS)
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target), prefix=".variant-")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                img.save(out, pil_format, quality=quality, optimize=True)
+            os.replace(tmp_path, target)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    return target
+
+
+# Runs in a worker process: every missing width/format of one image
+def generate_all(source: str) -> int:
+    stem = os.path.splitext(os.path.basename(source))[0]
+    created = 0
+    for width in VARIANT_WIDTHS:
+        for fmt in VARIANT_FORMATS:
+            target = variant_path(width, stem, fmt)
+            if not os.path.exists(target):
+                try:
+                    generate_variant(source, width, fmt, target)
+                    created += 1
+                except IMAGE_ERRORS:
+                    pass  # unreadable, corrupt or oversized image, served without variants
+    return created
+
+
+# Fire and forget after an upload
+def schedule_variants(image_url: Optional[str]) -> None:
+    if not image_url:
+        return
+    source = source_path(os.path.splitext(os.path.basename(image_url))[0])
+    if source:
+        submit(generate_all, source)
+
+
+# Path of a variant, generated now if it doesn't exist yet. The source image's
+# path if the variant can't be generated, None if there's no source image.
+async def ensure_variant(width: int, stem: str, fmt: str) -> Optional[str]:
+    target = variant_path(width, stem, fmt)
+    if os.path.exists(target):
+        return target
+
+    source = source_path(stem)
+    if source is None:
+        return None
+
+    # Concurrent requests for the same missing variant share one job
+    future = _inflight.get(target)
+    if future is None:
+        future = asyncio.wrap_future(submit(generate_variant, source, width, fmt, target))
+        _inflight[target] = future
+        future.add_done_callback(lambda _: _inflight.pop(target, None))
+    try:
+        await asyncio.shield(future)
+    except (*IMAGE_ERRORS, BrokenProcessPool):
+        return source
+    return target
+
+
+# Variants for every stored image, e.g. after seeding
+def generate_all_variants(directory: str = IMAGE_DIR) -> int:
+    sources = [
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.lower().endswith(SOURCE_EXTENSIONS) and not name.startswith(".")
+    ]
+    created = 0
+    for done, count in enumerate(pool().map(generate_all, sources, chunksize=32), start=1):
+        created += count
+        if done % 1000 == 0:
+            print(f"{done}/{len(sources)} images processed")
+    print(f"Generated {created} image variants for {len(sources)} images")
+    return created
+
+
+if __name__ == "__main__":
+    try:
+        generate_all_variants()
+    finally:
+        shutdown()
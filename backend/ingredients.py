@@ -0,0 +1,79 @@
+# backend/ingredients.py
+# Normalizes free-text ingredient lines into a small vocabulary of terms,
+# e.g. "2 large eggs, lightly beaten" -> ["egg"] and
+#      "1 cup all-purpose flour (spooned)" -> ["all-purpose", "flour"].
+# Recipes store their terms in Recipes.ingredient_terms (GIN indexed), so
+# pantry lists can be matched against the catalog with array overlap.
+
+import re
+
+UNITS = {
+    "cup", "tablespoon", "tbsp", "teaspoon", "tsp", "ounce", "oz", "pound", "lb", "lbs",
+    "gram", "g", "kilogram", "kg", "ml", "milliliter", "liter", "litre", "l", "quart",
+    "qt", "pint", "pt", "gallon", "pinch", "dash", "can", "jar", "package", "pkg",
+    "stick", "slice", "sprig", "bunch", "handful", "head", "clove", "piece", "inch",
+    "container", "bag", "box", "bottle", "envelope", "drop", "sheet", "stalk",
+}
+
+# Quantities, preparation and size words that don't identify the ingredient
+DESCRIPTORS = {
+    "a", "an", "and", "or", "of", "the", "to", "for", "into", "in", "on", "at", "with",
+    "about", "plus", "more", "less", "as", "needed", "taste", "serving", "optional",
+    "divided", "large", "small", "medium", "extra", "fresh", "freshly", "chopped",
+    "minced", "diced", "sliced", "thinly", "finely", "coarsely", "roughly", "ground",
+    "grated", "shredded", "peeled", "seeded", "halved", "quartered", "trimmed",
+    "cut", "whole", "room", "temperature", "softened", "melted", "beaten", "lightly",
+    "packed", "cubed", "crushed", "torn", "rinsed", "drained", "cooked", "uncooked",
+    "raw", "cold", "warm", "hot", "good", "quality", "such", "preferably", "very",
+    "well", "thick", "thin", "removed", "discarded", "some", "other", "your",
+    "favorite", "each", "total", "halves", "kosher", "salted", "unsalted",
+}
+
+# Assumed to be in every kitchen; matching on them would rank everything equally.
+# A line is a staple when all of its words are (STAPLE_WORDS adds the words
+# that only qualify one), so "black pepper" is dropped but "bell pepper" and
+# "ice cream" keep all their terms.
+STAPLES = {"salt", "pepper", "water", "ice"}
+STAPLE_WORDS = STAPLES | {"black", "white", "sea", "table", "flaky", "iodized"}
+
+_PARENS = re.compile(r"\([^)]*\)")
+_WORD = re.compile(r"[a-z][a-z\-']*")
+_POSSESSIVE = re.compile(r"'s?$")
+
+
+def singular(word: str) -> str:
+    if len(word) <= 3 or word.endswith(("ss", "us", "is")):
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith(("oes", "ches", "shes", "xes")):
+        return word[:-2]
+    if word.endswith("s"):
+        return word[:-1]
+    return word
+
+
+# Terms for a single ingredient line
+def normalize_ingredient(line: str) -> list[str]:
+    text = _PARENS.sub(" ", line.lower())
+    text = text.split(",", 1)[0]  # text after the first comma is preparation notes
+
+    terms = []
+    for word in _WORD.findall(text):
+        word = singular(_POSSESSIVE.sub("", word).strip("-'"))  # "baker's" -> "baker"
+        if len(word) < 2 or word in DESCRIPTORS or word in UNITS:
+            continue
+        if word not in terms:
+            terms.append(word)
+
+    if terms and set(terms) <= STAPLE_WORDS and set(terms) & STAPLES:
+        return []
+    return terms
+
+
+# Sorted, de-duplicated terms for a whole ingredient list
+def ingredient_terms(lines) -> list[str]:
+    terms = set()
+    for line in lines or []:
+        terms.update(normalize_ingredient(line))
+    return sorted(terms)
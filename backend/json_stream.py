@@ -0,0 +1,84 @@
+# backend/json_stream.py
+# Incremental parser for a streamed AI recipe answer
+#
+# The model answers with `[{"title": ..., "ingredients": [...], "steps": ...}]`,
+# one token at a time. RecipeStreamParser is fed the text as it arrives and
+# returns each top-level field of the first object as soon as its value is
+# complete, so clients can render the title long before the steps are done.
+
+import json
+from typing import Any
+
+
+class RecipeStreamParser:
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0              # next character to scan
+        self.depth = 0            # [ / { nesting outside of strings
+        self.in_string = False
+        self.escape = False
+        self.string_start = None
+        self.object_depth = None  # depth inside the first object
+        self.key = None           # key of the value being read
+        self.value_start = None
+        self.fields: dict[str, Any] = {}
+        self.done = False
+
+    # Adds streamed text, returns the (key, value) pairs completed by it
+    def feed(self, text: str) -> list[tuple[str, Any]]:
+        self.buffer += text
+        completed = []
+
+        while self.pos < len(self.buffer) and not self.done:
+            i = self.pos
+            ch = self.buffer[i]
+            self.pos += 1
+
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+                    if self.depth == self.object_depth and self.value_start is None:
+                        self.key = json.loads(self.buffer[self.string_start:i + 1])
+                continue
+
+            if ch == '"':
+                self.in_string = True
+                self.string_start = i
+            elif ch in "[{":
+                self.depth += 1
+                if ch == "{" and self.object_depth is None:
+                    self.object_depth = self.depth
+            elif ch in "]}":
+                if ch == "}" and self.depth == self.object_depth:
+                    self._finish_value(i, completed)
+                    self.done = True
+                self.depth -= 1
+            elif self.depth == self.object_depth:
+                if ch == ":" and self.key is not None:
+                    self.value_start = self.pos
+                elif ch == ",":
+                    self._finish_value(i, completed)
+
+        return completed
+
+    def _finish_value(self, end: int, completed: list) -> None:
+        if self.key is not None and self.value_start is not None:
+            raw = self.buffer[self.value_start:end].strip()
+            try:
+                value = json.loads(raw)
+            except ValueError:
+                raise ValueError(f"Invalid JSON value for {self.key!r}")
+            self.fields[self.key] = value
+            completed.append((self.key, value))
+        self.key = None
+        self.value_start = None
+
+    # All fields of the first object; raises if the object never closed
+    def result(self) -> dict[str, Any]:
+        if not self.done:
+            raise ValueError("Incomplete JSON object")
+        return self.fields
@@ -0,0 +1,156 @@
+# backend/llm.py
+# Async access to the Hugging Face inference API for the AI routes
+#
+# - never blocks a worker thread (AsyncInferenceClient)
+# - hard timeout per request, including time spent waiting for a slot (504)
+# - at most LLM_MAX_CONCURRENCY upstream calls in flight; up to LLM_MAX_QUEUE
+#   more may wait, anything beyond that is shed immediately with a 503
+# - HF_BASE_URL points the client at another (e.g. local fake) server
+# - every call is timed into llm_request_duration_seconds and the request's "llm" phase
+
+import asyncio
+import os
+import time
+from contextlib import contextmanager
+
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from huggingface_hub import AsyncInferenceClient
+
+from backend import metrics
+
+load_dotenv()
+HF_API_TOKEN = os.getenv("HF_API_TOKEN")
+HF_BASE_URL = os.getenv("HF_BASE_URL") or None
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+LLM_MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", "16"))
+
+client = AsyncInferenceClient(base_url=HF_BASE_URL, api_key=HF_API_TOKEN, timeout=LLM_TIMEOUT)
+
+
+class UpstreamLimiter:
+    def __init__(self, limit: int, max_queue: int):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self._semaphore = asyncio.Semaphore(limit)
+
+    def full(self) -> bool:
+        return self.active >= self.limit and self.waiting >= self.max_queue
+
+    # Fails fast with a 503 instead of queueing when the queue is already full
+    def check(self) -> None:
+        if self.full():
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="AI service is busy, try again shortly",
+                headers={"Retry-After": "5"},
+            )
+
+    async def acquire(self) -> None:
+        self.check()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.active += 1
+
+    def release(self) -> None:
+        self.active -= 1
+        self._semaphore.release()
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.release()
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "waiting": self.waiting,
+            "limit": self.limit,
+            "max_queue": self.max_queue,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+        }
+
+
+upstream = UpstreamLimiter(LLM_MAX_CONCURRENCY, LLM_MAX_QUEUE)
+
+
+@contextmanager
+def _timed(mode: str):
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        with metrics.phase("llm"):
+            yield
+        outcome = "ok"
+    except HTTPException as exc:
+        outcome = {503: "rejected", 504: "timeout"}.get(exc.status_code, "error")
+        raise
+    except (GeneratorExit, asyncio.CancelledError):
+        outcome = "cancelled"  # client went away mid-stream
+        raise
+    finally:
+        metrics.llm_seconds.observe(time.perf_counter() - started, mode, outcome)
+
+
+async def _complete(prompt: str, **params) -> str:
+    async with upstream:
+        completion = await client.chat.completions.create(
+            messages=[{"role": "user", "content": prompt}],
+            **params,
+        )
+    return completion.choices[0].message["content"]
+
+
+# Single chat completion, returns the generated text
+async def complete(prompt: str, **params) -> str:
+    with _timed("complete"):
+        try:
+            return await asyncio.wait_for(_complete(prompt, **params), LLM_TIMEOUT)
+        except asyncio.TimeoutError:
+            upstream.timeouts += 1
+            raise HTTPException(status_code=504, detail="AI service timed out")
+
+
+# Streaming chat completion, yields text deltas as they arrive.
+# LLM_TIMEOUT bounds the whole stream, including the wait for a slot.
+async def stream(prompt: str, **params):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + LLM_TIMEOUT
+
+    async def within_deadline(awaitable):
+        try:
+            return await asyncio.wait_for(awaitable, max(deadline - loop.time(), 0))
+        except asyncio.TimeoutError:
+            upstream.timeouts += 1
+            raise HTTPException(status_code=504, detail="AI service timed out")
+
+    with _timed("stream"):
+        await within_deadline(upstream.acquire())
+        try:
+            chunks = await within_deadline(client.chat.completions.create(
+                messages=[{"role": "user", "content": prompt}],
+                stream=True,
+                **params,
+            ))
+            iterator = chunks.__aiter__()
+            while True:
+                try:
+                    chunk = await within_deadline(iterator.__anext__())
+                except StopAsyncIteration:
+                    break
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            upstream.release()
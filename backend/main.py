@@ -1,18 +1,28 @@
 
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from backend.routes import users, recipes, favorites
-from backend import models
-from backend.database import engine
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import PlainTextResponse
+from backend.routes import users, recipes, favorites, images as image_routes
+from backend import models, images, popularity, metrics, llm, passwords, recipe_cache
+from backend.database import engine, async_engine, pool_stats, async_pool_stats, pool_status
+from backend.http_cache import CachedStaticFiles
+from backend.compression import CompressionMiddleware
 
-app = FastAPI(title="MyRecipeBox API")
 
-app.mount(
-    "/images",
-    StaticFiles(directory="backend/data/Food_Images/Food_Images"),
-    name="images"
-)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    reconcile = None
+    if popularity.FAVORITE_RECONCILE_INTERVAL > 0:
+        reconcile = asyncio.create_task(popularity.reconcile_loop())
+    yield
+    if reconcile:
+        reconcile.cancel()
+    images.shutdown()  # image variant worker processes
+
+
+app = FastAPI(title="MyRecipeBox API", lifespan=lifespan)
 
 origins = [
     "http://localhost:5173",
@@ -28,12 +38,69 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CompressionMiddleware)  # gzip/brotli for JSON bodies
+app.add_middleware(metrics.MetricsMiddleware)  # outermost: times everything below
+
+metrics.instrument_engine(engine, "sync")
+metrics.instrument_engine(async_engine.sync_engine, "async")
 
 # Include routers
 app.include_router(users.router)
 app.include_router(recipes.router)
 app.include_router(favorites.router)
+app.include_router(image_routes.router)  # /images/w/... variants, before the static mount
+
+app.mount(
+    "/images",
+    CachedStaticFiles(directory="backend/data/Food_Images/Food_Images"),
+    name="images"
+)
 
 @app.get("/")
 def read_root():
-    return {"message": "Welcome to MyRecipeBox API"}
\ No newline at end of file
+    return {"message": "Welcome to MyRecipeBox API"}
+
+
+# Connection pool usage (checked out connections, overflow, checkout wait times)
+@app.get("/health/db-pool")
+def db_pool_status():
+    return {
+        "sync": pool_status(engine, pool_stats),
+        "async": pool_status(async_engine.sync_engine, async_pool_stats),
+    }
+
+
+# Pool, cache, LLM limiter and password hashing state, read at scrape time
+def collect_app_stats() -> list[str]:
+    lines = []
+    pools = {"sync": pool_status(engine, pool_stats),
+             "async": pool_status(async_engine.sync_engine, async_pool_stats)}
+    for key in ("checked_out", "overflow", "peak_checked_out", "checkouts", "timeouts", "wait_seconds_total"):
+        kind = "gauge" if key in ("checked_out", "overflow", "peak_checked_out") else "counter"
+        lines += metrics.sample_lines(f"db_pool_{key}", f"Connection pool {key.replace('_', ' ')}",
+                                      [({"pool": name}, status[key]) for name, status in pools.items()], kind)
+
+    caches = [recipes.suggest_cache.stats(), users.user_cache.stats(),
+              recipe_cache.documents.stats(), recipe_cache.favorites.stats()]
+    for key in ("hits", "misses", "coalesced"):
+        lines += metrics.sample_lines(f"cache_{key}_total", f"Cache {key}",
+                                      [({"cache": c["name"]}, c[key]) for c in caches], "counter")
+
+    upstream = llm.upstream.stats()
+    for key in ("active", "waiting"):
+        lines += metrics.sample_lines(f"llm_upstream_{key}", f"LLM calls {key}", [({}, upstream[key])])
+    for key in ("rejected", "timeouts"):
+        lines += metrics.sample_lines(f"llm_upstream_{key}_total", f"LLM calls {key}", [({}, upstream[key])], "counter")
+
+    lines += metrics.sample_lines("password_hash_pending", "bcrypt jobs running or queued",
+                                  [({}, passwords.stats()["pending"])])
+    return lines
+
+
+metrics.register_collector(collect_app_stats)
+
+
+# Prometheus scrape endpoint
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
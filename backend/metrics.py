@@ -0,0 +1,230 @@
+# backend/metrics.py
+# Request instrumentation and Prometheus metrics (GET /metrics)
+#
+# MetricsMiddleware times every request by route template and keeps a
+# per-request RequestStats in a ContextVar. Database time is collected by
+# cursor_execute events on both engines, and code can time its own sections
+# with `with phase("auth"):`. Per request the phases ("db", "llm", "auth")
+# and the statement count go into histograms, so /metrics shows which route
+# spends its time where.
+#
+# Slow requests (SLOW_REQUEST_SECONDS) and slow statements
+# (SLOW_QUERY_SECONDS) are logged, sampled at SLOW_LOG_SAMPLE_RATE.
+
+import bisect
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+from sqlalchemy import event
+
+SLOW_REQUEST_SECONDS = float(os.getenv("SLOW_REQUEST_SECONDS", "1.0"))
+SLOW_QUERY_SECONDS = float(os.getenv("SLOW_QUERY_SECONDS", "0.2"))
+SLOW_LOG_SAMPLE_RATE = float(os.getenv("SLOW_LOG_SAMPLE_RATE", "1.0"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+
+logger = logging.getLogger("backend.metrics")
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: tuple, buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._series = {}  # label values -> [bucket counts..., count, sum]
+
+    def observe(self, value: float, *label_values) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {key: list(series) for key, series in self._series.items()}
+        for label_values, series in sorted(snapshot.items()):
+            base = dict(zip(self.labels, label_values))
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{format_labels(base, le=bound)} {cumulative}")
+            lines.append(f"{self.name}_bucket{format_labels(base, le='+Inf')} {series[-2]}")
+            labels = format_labels(base)
+            lines.append(f"{self.name}_count{labels} {series[-2]}")
+            lines.append(f"{self.name}_sum{labels} {series[-1]:.6f}")
+        return lines
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels: dict, **extra) -> str:
+    labels = {**labels, **extra}
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+# Lines for a gauge (or counter) read from elsewhere at scrape time
+def sample_lines(name: str, help: str, samples: list, kind: str = "gauge") -> list[str]:
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        lines.append(f"{name}{format_labels(labels)} {float(value or 0)}")
+    return lines
+
+
+request_seconds = Histogram(
+    "http_request_duration_seconds", "Request latency by route template",
+    ("method", "route", "status"),
+)
+phase_seconds = Histogram(
+    "http_request_phase_seconds", "Time spent per request in db, llm and auth",
+    ("method", "route", "phase"),
+)
+request_statements = Histogram(
+    "http_request_db_statements", "SQL statements executed per request",
+    ("method", "route"), COUNT_BUCKETS,
+)
+statement_seconds = Histogram(
+    "db_statement_duration_seconds", "SQL statement latency", ("engine",),
+)
+llm_seconds = Histogram(
+    "llm_request_duration_seconds", "Upstream LLM call latency", ("mode", "outcome"),
+)
+
+_collectors: list[Callable[[], list[str]]] = []
+
+
+# Adds gauges computed at scrape time (pool, cache, limiter stats)
+def register_collector(collector: Callable[[], list[str]]) -> None:
+    _collectors.append(collector)
+
+
+def render() -> str:
+    lines = []
+    for histogram in (request_seconds, phase_seconds, request_statements, statement_seconds, llm_seconds):
+        lines.extend(histogram.render())
+    for collector in _collectors:
+        lines.extend(collector())
+    return "\n".join(lines) + "\n"
+
+
+# Per-request counters. Threadpool routes and dependencies run in a copy of
+# the request's context, so they update the same object.
+class RequestStats:
+    def __init__(self):
+        self.statements = 0
+        self.phases = {}
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+@contextmanager
+def phase(name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats = current_request.get()
+        if stats is not None:
+            stats.add(name, time.perf_counter() - started)
+
+
+def sampled() -> bool:
+    return SLOW_LOG_SAMPLE_RATE >= 1.0 or random.random() < SLOW_LOG_SAMPLE_RATE
+
+
+# cursor_execute timing for an engine (pass async_engine.sync_engine for asyncpg)
+def instrument_engine(engine, label: str) -> None:
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["metrics_started"].pop()
+        statement_seconds.observe(elapsed, label)
+
+        stats = current_request.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.add("db", elapsed)
+
+        if elapsed >= SLOW_QUERY_SECONDS and sampled():
+            logger.warning("Slow query (%s, %.3fs): %s", label, elapsed, " ".join(statement.split())[:500])
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("metrics_started"):
+            conn.info["metrics_started"].pop()
+
+
+def route_label(scope) -> str:
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    if scope["path"].startswith("/images"):
+        return "/images"
+    return "unmatched"  # 404s: don't create a series per random path
+
+
+# Pure ASGI middleware, so streamed responses are timed until their last chunk
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            current_request.reset(token)
+            self.record(scope, status, elapsed, stats)
+
+    def record(self, scope, status: int, elapsed: float, stats: RequestStats) -> None:
+        method, route = scope["method"], route_label(scope)
+        request_seconds.observe(elapsed, method, route, str(status))
+        request_statements.observe(stats.statements, method, route)
+        for name, seconds in stats.phases.items():
+            phase_seconds.observe(seconds, method, route, name)
+
+        if elapsed >= SLOW_REQUEST_SECONDS and sampled():
+            phases = " ".join(f"{name}={seconds:.3f}s" for name, seconds in sorted(stats.phases.items()))
+            logger.warning("Slow request %s %s -> %s in %.3fs (%d statements %s)",
+                           method, scope["path"], status, elapsed, stats.statements, phases)
@@ -4,16 +4,29 @@ Users
   id | name | email | password_hash
 
 Recipes
-  id | title | ingredients | steps | image_url | created_by (user_id)
+  id | title | ingredients | steps | image_url | created_by (user_id) | updated_at | favorite_count
 
 Favorites
   id | user_id | recipe_id
+
+RecipeSimilarities (precomputed "more like this", backend/recommendations.py)
+  recipe_id | similar_id | score
+
+RecipeTermIdf
+  term | df | idf
 '''
 
-from sqlalchemy import Column, Integer, String, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Computed, Index, DDL, event, func, text
+from sqlalchemy.orm import relationship, deferred, validates
 from backend.database import Base
-from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
+from backend.ingredients import ingredient_terms
+
+# Full-text document for search: title matches rank above matches in the steps
+SEARCH_DOCUMENT = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(steps, '')), 'B')"
+)
 
 class Users(Base):
     __tablename__ = "users"
@@ -23,7 +36,10 @@ class Users(Base):
     email = Column(String, unique=True, nullable=False, index=True)
     password_hash = Column(String, nullable=False)
 
-    recipes = relationship("Recipes", back_populates="creator")
+    # Collections are never loaded implicitly (raise_on_sql): load them with an
+    # explicit selectinload() where needed. Rows are removed by ON DELETE CASCADE.
+    recipes = relationship("Recipes", back_populates="creator", lazy="raise_on_sql", passive_deletes=True)
+    favorites = relationship("Favorites", back_populates="user", lazy="raise_on_sql", passive_deletes=True)
 
 class Recipes(Base):
     __tablename__ = "recipes"
@@ -31,11 +47,42 @@ class Recipes(Base):
     id = Column(Integer, primary_key=True)
     title = Column(String, nullable=False)
     ingredients = Column(ARRAY(String), nullable=False) 
+    # Normalized ingredient vocabulary ("2 large eggs" -> "egg"), kept in sync with ingredients
+    ingredient_terms = Column(ARRAY(String), nullable=False, server_default="{}")
     steps = Column(String, nullable=False)
     image_url = Column(String, nullable=True)
     created_by = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=True) #If null then it data that was available and not added by the user
+    # Row version for HTTP caching (ETags); bumped on every ORM update
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
+    # Number of favorites rows, kept up to date by add/remove_favorite and
+    # reconciled periodically (backend/popularity.py)
+    favorite_count = Column(Integer, nullable=False, server_default="0")
+    # Maintained by Postgres, only used in WHERE/ORDER BY so never loaded by default
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_DOCUMENT, persisted=True)))
 
-    creator = relationship("Users", back_populates="recipes")
+    # Load it with responses.creator_name() when showing created_by_name; a
+    # lazy load would be one more query per row, so it raises instead
+    creator = relationship("Users", back_populates="recipes", lazy="raise_on_sql")
+    favorited_by = relationship("Favorites", back_populates="recipe", lazy="raise_on_sql", passive_deletes=True)
+
+    __table_args__ = (
+        Index("ix_recipes_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_recipes_title_trgm", "title", postgresql_using="gin",
+              postgresql_ops={"title": "gin_trgm_ops"}),
+        Index("ix_recipes_ingredient_terms", "ingredient_terms", postgresql_using="gin"),
+        # Identifies seeded (dataset) rows so bulk imports can be re-run safely
+        Index("ux_recipes_seed_source", "image_url", "title", unique=True,
+              postgresql_where=text("created_by IS NULL")),
+        Index("ix_recipes_title", "title"),
+        Index("ix_recipes_created_by", "created_by"),
+        # /recipes/popular walks this backwards: favorite_count DESC, id DESC
+        Index("ix_recipes_popular", "favorite_count", "id"),
+    )
+
+    @validates("ingredients")
+    def _sync_ingredient_terms(self, key, value):
+        self.ingredient_terms = ingredient_terms(value)
+        return value
 
 class Favorites(Base):
     __tablename__ = "favorites"
@@ -44,5 +91,35 @@ class Favorites(Base):
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     recipe_id = Column(Integer, ForeignKey("recipes.id", ondelete="CASCADE"), nullable=False)
 
-    user = relationship("Users", backref="favorites")
-    recipe = relationship("Recipes", backref="favorited_by")
\ No newline at end of file
+    user = relationship("Users", back_populates="favorites")
+    recipe = relationship("Recipes", back_populates="favorited_by")
+
+    __table_args__ = (
+        # One row per (user, recipe); target of the ON CONFLICT in add_favorite
+        Index("ux_favorites_user_recipe", "user_id", "recipe_id", unique=True),
+        Index("ix_favorites_recipe_id", "recipe_id"),
+    )
+
+class RecipeSimilarities(Base):
+    __tablename__ = "recipe_similarities"
+
+    recipe_id = Column(Integer, ForeignKey("recipes.id", ondelete="CASCADE"), primary_key=True)
+    similar_id = Column(Integer, ForeignKey("recipes.id", ondelete="CASCADE"), primary_key=True)
+    score = Column(Float, nullable=False)  # cosine similarity of the TF-IDF ingredient vectors
+
+    __table_args__ = (
+        # A recipe's neighbours, best first: /recipes/id/{id}/similar reads k entries of this
+        Index("ix_recipe_similarities_score", recipe_id, score.desc()),
+        Index("ix_recipe_similarities_similar_id", "similar_id"),
+    )
+
+# Inverse document frequency of each ingredient term, as of the last full rebuild
+class RecipeTermIdf(Base):
+    __tablename__ = "recipe_term_idf"
+
+    term = Column(String, primary_key=True)
+    df = Column(Integer, nullable=False)
+    idf = Column(Float, nullable=False)
+
+# The trigram index needs pg_trgm to exist before create_all builds the tables
+event.listen(Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
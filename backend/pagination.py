@@ -0,0 +1,125 @@
+# backend/pagination.py
+# Helpers shared by the paginated endpoints (/recipes, /recipes/search, /favorites)
+#
+# Two modes are supported:
+#   - offset mode: ?page=N&page_size=M (the original behaviour)
+#   - cursor mode: ?after=<token>&page_size=M, where the token is the opaque
+#     `next_cursor` returned by the previous page. Cursor pages are keyset
+#     lookups (WHERE id > last_id, or (rank, id) for ranked search results),
+#     so page 1000 costs the same as page 1.
+
+import base64
+import json
+from typing import Literal, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# exact = count(*), estimated = planner estimate, none = skip counting
+CountMode = Literal["exact", "estimated", "none"]
+
+
+def encode_cursor(values: dict) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> dict:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if not isinstance(values, dict) or not isinstance(values.get("id"), int):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if "rank" in values and not isinstance(values["rank"], (int, float)):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+# Estimated row count of a select, read from the planner instead of running count(*)
+async def estimated_count(db: AsyncSession, statement) -> int:
+    conn = await db.connection()
+    compiled = statement.order_by(None).compile(dialect=conn.dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup or ())
+    plan = (await conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + str(compiled), params)).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def count_rows(db: AsyncSession, statement, mode: CountMode) -> Optional[int]:
+    if mode == "none":
+        return None
+    if mode == "estimated":
+        return await estimated_count(db, statement)
+    counted = select(func.count()).select_from(statement.order_by(None).subquery())
+    return (await db.execute(counted)).scalar_one()
+
+
+# Builds the response body shared by every paginated endpoint
+def page_response(items: list, page: int, page_size: int, total: Optional[int],
+                  next_cursor: Optional[str], **extra) -> dict:
+    return {
+        **extra,
+        "page": page,
+        "page_size": page_size,
+        "total": total,
+        "total_pages": (total + page_size - 1) // page_size if total is not None else None,
+        "next_cursor": next_cursor,
+        "recipes": items,
+    }
+
+
+# Fetches one page of a select(Model) ordered by `key_column`, either by offset
+# or after a cursor. With `rank`, rows are ordered by rank (highest first) and
+# then key, and the cursor carries both values.
+# Returns (rows, next_cursor); one extra row is read to know if there's a next page.
+async def fetch_page(db: AsyncSession, statement, key_column, page: int, page_size: int,
+                     after: Optional[str], rank=None):
+    if rank is None:
+        ordered = statement.order_by(key_column)
+    else:
+        ordered = statement.add_columns(rank.label("rank")).order_by(rank.desc(), key_column)
+
+    if after:
+        cursor = decode_cursor(after)
+        if rank is None:
+            ordered = ordered.where(key_column > cursor["id"])
+        elif "rank" in cursor:
+            ordered = ordered.where(or_(
+                rank < cursor["rank"],
+                and_(rank == cursor["rank"], key_column > cursor["id"]),
+            ))
+        else:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    else:
+        ordered = ordered.offset((page - 1) * page_size)
+
+    result = await db.execute(ordered.limit(page_size + 1))
+    rows = result.scalars().all() if rank is None else result.all()
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+
+    next_cursor = None
+    if rank is None:
+        if has_more:
+            next_cursor = encode_cursor({"id": rows[-1].id})
+        return rows, next_cursor
+
+    if has_more:
+        last, last_rank = rows[-1]
+        next_cursor = encode_cursor({"id": last.id, "rank": float(last_rank)})
+    return [row for row, _ in rows], next_cursor
+
+
+# Loads the remaining columns of rows fetched with load_only() (see
+# http_cache.version_only) in one query. The rows are already in the session,
+# so only their unloaded columns are filled in (relationships loaded by the
+# first query are kept) and they keep their page order.
+async def load_full_rows(db: AsyncSession, model, rows: list) -> list:
+    if rows:
+        await db.execute(select(model).where(model.id.in_([r.id for r in rows])))
+    return rows
@@ -0,0 +1,63 @@
+# backend/passwords.py
+# Password hashing off the request path
+#
+# bcrypt costs tens to hundreds of ms of CPU per call. Hashing and
+# verification run on a dedicated, size-limited thread pool (bcrypt releases
+# the GIL while it works), so a burst of logins can't take over the event
+# loop or Starlette's threadpool. Once PASSWORD_HASH_QUEUE jobs are waiting,
+# new requests get a 503 instead of queueing without bound.
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from fastapi import HTTPException
+from passlib.context import CryptContext
+from dotenv import load_dotenv
+
+load_dotenv()
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_QUEUE = int(os.getenv("PASSWORD_HASH_QUEUE", "64"))
+
+# Hashes made with a different cost factor are flagged by needs_update()
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+_pending = 0  # jobs running or queued on the executor
+
+
+async def _run(fn, *args):
+    global _pending
+    if _pending >= PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE:
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy, try again shortly",
+            headers={"Retry-After": "1"},
+        )
+
+    _pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_executor, fn, *args)
+    finally:
+        _pending -= 1
+
+
+async def hash_password(password: str) -> str:
+    return await _run(pwd_context.hash, password)
+
+
+# Returns (valid, new_hash); new_hash is set when the stored hash should be
+# replaced, e.g. after BCRYPT_ROUNDS changed
+async def verify_password(plain: str, hashed: str) -> tuple[bool, Optional[str]]:
+    return await _run(pwd_context.verify_and_update, plain, hashed)
+
+
+def stats() -> dict:
+    return {
+        "workers": PASSWORD_HASH_WORKERS,
+        "max_queue": PASSWORD_HASH_QUEUE,
+        "pending": _pending,
+        "rounds": BCRYPT_ROUNDS,
+    }
@@ -0,0 +1,85 @@
+# backend/popularity.py
+# Favorite counts behind /recipes/popular
+#
+# recipes.favorite_count moves by one in the same transaction as each favorite
+# insert/delete. Counts can still drift (favorites removed by ON DELETE
+# CASCADE when a user is deleted, manual SQL), so reconcile_favorite_counts()
+# recomputes them from the favorites table and rewrites only the rows that
+# differ. The API runs it every FAVORITE_RECONCILE_INTERVAL seconds (0 = never);
+# an advisory lock keeps several workers from doing the same pass at once.
+#
+#   python -m backend.popularity      (reconcile once)
+
+import asyncio
+import logging
+import os
+
+from sqlalchemy import func, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend import models
+from backend.database import AsyncSessionLocal, async_engine
+
+FAVORITE_RECONCILE_INTERVAL = float(os.getenv("FAVORITE_RECONCILE_INTERVAL", "3600"))
+RECONCILE_LOCK_ID = 720_020  # pg advisory lock key
+
+logger = logging.getLogger(__name__)
+
+RECONCILE_SQL = text("""
+    UPDATE recipes r
+    SET favorite_count = counted.n
+    FROM (
+        SELECT recipes.id, count(favorites.id) AS n
+        FROM recipes LEFT JOIN favorites ON favorites.recipe_id = recipes.id
+        GROUP BY recipes.id
+    ) counted
+    WHERE r.id = counted.id AND r.favorite_count <> counted.n
+""")
+
+
+# Part of the caller's transaction. updated_at is left alone: counts aren't in
+# the ETag'd responses, so a favorite shouldn't invalidate everyone's listings.
+async def adjust_favorite_count(db: AsyncSession, recipe_id: int, delta: int) -> None:
+    await db.execute(
+        update(models.Recipes)
+        .where(models.Recipes.id == recipe_id)
+        .values(
+            favorite_count=func.greatest(models.Recipes.favorite_count + delta, 0),
+            updated_at=models.Recipes.updated_at,
+        )
+    )
+
+
+# Returns the number of recipes whose count was corrected (None if another
+# worker holds the lock)
+async def reconcile_favorite_counts():
+    async with AsyncSessionLocal() as db:
+        locked = (await db.execute(text("SELECT pg_try_advisory_xact_lock(:id)"), {"id": RECONCILE_LOCK_ID})).scalar()
+        if not locked:
+            return None
+        corrected = (await db.execute(RECONCILE_SQL)).rowcount
+        await db.commit()
+    return corrected
+
+
+async def reconcile_loop(interval: float = FAVORITE_RECONCILE_INTERVAL) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            corrected = await reconcile_favorite_counts()
+            if corrected:
+                logger.warning("Reconciled favorite_count on %d recipes", corrected)
+        except Exception:
+            logger.exception("Favorite count reconciliation failed")
+
+
+if __name__ == "__main__":
+    async def main():
+        try:
+            corrected = await reconcile_favorite_counts()
+        finally:
+            await async_engine.dispose()
+        print("Another reconciliation is running" if corrected is None
+              else f"Corrected favorite_count on {corrected} recipes")
+
+    asyncio.run(main())
@@ -0,0 +1,140 @@
+# backend/recipe_cache.py
+# Read-through cache for recipe documents and the first listing pages
+#
+# Recipe data is the same for every user, only the favorite flag differs. So
+# GET /recipes/id/{id} documents and the first RECIPE_CACHE_PAGES offset pages
+# of GET /recipes/ are cached without it, as the JSON-ready dicts the routes
+# return, and each user's favorite ids are cached separately and overlaid per
+# request. With the user also cached (backend/routes/users.py), a hot read
+# doesn't touch the database.
+#
+# Invalidation:
+#   - documents by recipe id, on update and delete (forget_recipe)
+#   - listing pages all at once: their keys carry a generation stamp that
+#     create, update and delete replace (bump_listings), since each of them
+#     changes totals or page contents; old generations age out (LRU/TTL)
+#   - a user's favorite ids, on add and remove favorite (forget_favorites)
+#
+# Misses are computed once per key however many requests ask at the same
+# time (Cache.aget_or_compute), on their own session. The in-process backend
+# only sees this worker's writes: other workers catch up within
+# RECIPE_CACHE_TTL for recipes and listings, and RECIPE_FAVORITES_TTL for the
+# favorites overlay (kept short, since a user toggling a favorite expects to
+# see it on the next request, whichever worker serves it). With
+# RECIPE_CACHE_URL=redis://... both caches and their invalidations are shared
+# between workers, and nothing is stale.
+
+import os
+import uuid
+from typing import Optional
+
+from sqlalchemy import select
+
+from backend import models
+from backend.cache import Cache, make_backend
+from backend.database import AsyncSessionLocal
+from backend.http_cache import make_etag, rows_etag
+from backend.pagination import CountMode, count_rows, fetch_page, page_response
+from backend.responses import Fields, document_options, recipe_items
+
+RECIPE_CACHE_URL = os.getenv("RECIPE_CACHE_URL")
+RECIPE_CACHE_SIZE = int(os.getenv("RECIPE_CACHE_SIZE", "5000"))
+RECIPE_CACHE_TTL = float(os.getenv("RECIPE_CACHE_TTL", "300"))
+RECIPE_CACHE_PAGES = int(os.getenv("RECIPE_CACHE_PAGES", "5"))
+RECIPE_FAVORITES_TTL = float(os.getenv("RECIPE_FAVORITES_TTL", "10"))
+MAX_CACHED_PAGE_SIZE = 100
+
+GENERATION_KEY = "recipes:generation"
+GENERATION_TTL = 30 * 86400
+
+documents = Cache("recipes", make_backend(RECIPE_CACHE_URL, RECIPE_CACHE_SIZE), ttl=RECIPE_CACHE_TTL)
+favorites = Cache("favorite_ids", make_backend(RECIPE_CACHE_URL, RECIPE_CACHE_SIZE), ttl=RECIPE_FAVORITES_TTL)
+
+
+# The item with this user's favorite flag (both spellings, see RecipeSummary)
+def with_favorite(item: dict, is_favorite: bool) -> dict:
+    return {**item, "is_favourite": is_favorite, "is_favorite": is_favorite}
+
+
+# Recipe documents
+
+async def _load_document(recipe_id: int) -> Optional[dict]:
+    async with AsyncSessionLocal() as db:
+        recipe = (await db.execute(
+            select(models.Recipes).options(*document_options("full")).where(models.Recipes.id == recipe_id)
+        )).scalars().first()
+    if recipe is None:
+        return None
+    item = recipe_items([recipe])[0]
+    return {
+        "etag": make_etag(recipe.id, recipe.updated_at.isoformat(), recipe.created_by),
+        "recipe": item.model_dump(mode="json"),
+    }
+
+
+# {"etag", "recipe"} or None if there's no such recipe
+async def recipe_document(recipe_id: int) -> Optional[dict]:
+    return await documents.aget_or_compute(f"doc:{recipe_id}", lambda: _load_document(recipe_id))
+
+
+# Listing pages
+
+def listing_generation() -> str:
+    generation = documents.backend.get(GENERATION_KEY)
+    if generation is None:
+        generation = bump_listings()
+    return generation
+
+
+def bump_listings() -> str:
+    generation = uuid.uuid4().hex[:12]
+    documents.backend.set(GENERATION_KEY, generation, GENERATION_TTL)
+    return generation
+
+
+# Only the first offset pages are shared by enough requests to be worth keeping
+def cacheable_page(page: int, page_size: int, after: Optional[str]) -> bool:
+    return after is None and 1 <= page <= RECIPE_CACHE_PAGES and 1 <= page_size <= MAX_CACHED_PAGE_SIZE
+
+
+async def _load_page(page: int, page_size: int, count: CountMode, fields: Fields) -> dict:
+    async with AsyncSessionLocal() as db:
+        query = select(models.Recipes)
+        recipes, next_cursor = await fetch_page(
+            db, query.options(*document_options(fields)), models.Recipes.id, page, page_size, None
+        )
+        total = await count_rows(db, query, count)
+    items = [item.model_dump(mode="json") for item in recipe_items(recipes, fields=fields)]
+    return {
+        "etag": rows_etag(recipes, total, page, page_size, next_cursor, fields),
+        "page": page_response(items, page, page_size, total, next_cursor),
+    }
+
+
+# {"etag", "page"}: a GET /recipes/ body without favorite flags
+async def listing_page(page: int, page_size: int, count: CountMode, fields: Fields) -> dict:
+    key = f"list:{listing_generation()}:{page}:{page_size}:{count}:{fields}"
+    return await documents.aget_or_compute(key, lambda: _load_page(page, page_size, count, fields))
+
+
+# Favorites overlay
+
+async def _load_favorite_ids(user_id: int) -> list[int]:
+    async with AsyncSessionLocal() as db:
+        rows = await db.execute(select(models.Favorites.recipe_id).where(models.Favorites.user_id == user_id))
+        return sorted(rows.scalars().all())
+
+
+async def favorite_ids(user_id: int) -> set[int]:
+    return set(await favorites.aget_or_compute(str(user_id), lambda: _load_favorite_ids(user_id)))
+
+
+# Invalidation (after the change is committed)
+
+def forget_recipe(recipe_id: int) -> None:
+    documents.invalidate(f"doc:{recipe_id}")
+    bump_listings()
+
+
+def forget_favorites(user_id: int) -> None:
+    favorites.invalidate(str(user_id))
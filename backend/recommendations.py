@@ -0,0 +1,226 @@
+# backend/recommendations.py
+# "More like this": precomputed similar recipes
+#
+# A recipe is a TF-IDF vector over its normalized ingredient terms
+# (backend/ingredients.py, every term counts once), and recipes are compared
+# by cosine similarity. The best SIMILAR_RECIPES_K neighbours of every recipe
+# are stored in recipe_similarities, so /recipes/id/{id}/similar reads k rows
+# of an index whatever the catalog size.
+#
+#   - rebuild_all(): full build with NumPy (python -m backend.recommendations).
+#     Run it after seeding, then periodically; it also refreshes the IDF table.
+#   - refresh_recipe(id): incremental, after a recipe is created or its
+#     ingredients change. Scores it against at most SIMILAR_MAX_CANDIDATES
+#     recipes sharing one of its selective terms (GIN index on
+#     ingredient_terms) with the stored IDF, rewrites its neighbours and adds
+#     it to the lists of the recipes it now ranks in.
+
+import csv
+import io
+import math
+import os
+import sys
+import time
+
+import numpy as np
+from sqlalchemy import delete, func, select, text
+
+from backend import models
+from backend.database import SessionLocal, engine
+
+SIMILAR_RECIPES_K = int(os.getenv("SIMILAR_RECIPES_K", "20"))
+# refresh_recipe() candidates: recipes sharing a term used by at most
+# SIMILAR_MAX_TERM_DF recipes (the rarest term if none is), at most
+# SIMILAR_MAX_CANDIDATES of them, so a write costs the same whatever the
+# catalog size. Common terms still count towards the scores.
+SIMILAR_MAX_TERM_DF = int(os.getenv("SIMILAR_MAX_TERM_DF", "2000"))
+SIMILAR_MAX_CANDIDATES = int(os.getenv("SIMILAR_MAX_CANDIDATES", "10000"))
+SIMILARITIES_LOCK_ID = 720_021  # pg advisory lock key
+
+
+def idf(df, n):
+    return np.log((1 + n) / (1 + np.asarray(df, dtype=np.float64))) + 1.0
+
+
+# Unit-length TF-IDF weights of one recipe's terms
+def term_weights(terms, idf_by_term: dict, default_idf: float) -> dict:
+    weights = {term: idf_by_term.get(term, default_idf) for term in set(terms)}
+    norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+    return {term: w / norm for term, w in weights.items()}
+
+
+# TF-IDF vectors of the whole catalog, stored by term like an inverted index:
+# a recipe's scores against every other recipe are accumulated from the
+# postings of its ~10 terms, so each recipe costs O(postings of its terms)
+# rather than O(catalog x vocabulary).
+class TermIndex:
+    def __init__(self, docs: list):
+        self.vocab = {}
+        doc_terms = [np.array([self.vocab.setdefault(t, len(self.vocab)) for t in set(terms)], dtype=np.int64)
+                     for terms in docs]
+        n = len(docs)
+        lengths = np.array([len(t) for t in doc_terms], dtype=np.int64)
+        self.terms = np.concatenate(doc_terms) if n else np.zeros(0, dtype=np.int64)
+        docs_of_terms = np.repeat(np.arange(n), lengths)
+
+        self.df = np.bincount(self.terms, minlength=len(self.vocab))
+        self.idf = idf(self.df, n)
+        weights = self.idf[self.terms]
+        norms = np.sqrt(np.bincount(docs_of_terms, weights=weights * weights, minlength=n))
+        self.weights = (weights / np.where(norms > 0, norms, 1.0)[docs_of_terms]).astype(np.float32)
+        self.offsets = np.concatenate(([0], np.cumsum(lengths)))  # doc i: terms[offsets[i]:offsets[i+1]]
+
+        # Postings: the docs (and weights) of each term, contiguous per term
+        order = np.argsort(self.terms, kind="stable")
+        self.posting_docs = docs_of_terms[order]
+        self.posting_weights = self.weights[order]
+        self.indptr = np.concatenate(([0], np.cumsum(self.df)))
+
+    # Top-k neighbours of every doc, as (recipe_id, similar_id, score) rows
+    def neighbours(self, ids: np.ndarray, k: int):
+        scores = np.zeros(len(ids), dtype=np.float32)
+        for i in range(len(ids)):
+            scores[:] = 0
+            start, end = self.offsets[i], self.offsets[i + 1]
+            for term, weight in zip(self.terms[start:end], self.weights[start:end]):
+                lo, hi = self.indptr[term], self.indptr[term + 1]
+                scores[self.posting_docs[lo:hi]] += weight * self.posting_weights[lo:hi]
+            scores[i] = 0
+
+            candidates = np.flatnonzero(scores)
+            if len(candidates) > k:
+                candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+            for j in candidates[np.argsort(-scores[candidates])]:
+                yield int(ids[i]), int(ids[j]), float(scores[j])
+
+    def idf_rows(self):
+        return [(term, int(self.df[i]), float(self.idf[i])) for term, i in self.vocab.items()]
+
+
+def _copy_rows(cur, table: str, columns: str, rows) -> None:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    cur.copy_expert(f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+# Full rebuild; readers keep seeing the previous neighbours until the commit
+def rebuild_all(k: int = SIMILAR_RECIPES_K) -> int:
+    started = time.perf_counter()
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT id, ingredient_terms FROM recipes")).all()
+    ids = np.array([row.id for row in rows], dtype=np.int64)
+    index = TermIndex([row.ingredient_terms or [] for row in rows])
+    neighbours = list(index.neighbours(ids, k))
+    print(f"Computed {len(neighbours)} neighbours for {len(ids)} recipes in {time.perf_counter() - started:.1f}s")
+
+    conn = engine.raw_connection()
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT pg_advisory_xact_lock(%s)", (SIMILARITIES_LOCK_ID,))  # see refresh_recipe()
+        cur.execute("DELETE FROM recipe_similarities")
+        _copy_rows(cur, "recipe_similarities", "recipe_id, similar_id, score", neighbours)
+        cur.execute("DELETE FROM recipe_term_idf")
+        _copy_rows(cur, "recipe_term_idf", "term, df, idf", index.idf_rows())
+        conn.commit()
+    finally:
+        conn.close()
+
+    print(f"Recipe similarities rebuilt in {time.perf_counter() - started:.1f}s")
+    return len(neighbours)
+
+
+# Terms of a recipe worth looking candidates up by: the ones at most
+# SIMILAR_MAX_TERM_DF recipes use (terms not in the IDF table yet are new,
+# so rare), or else the rarest one
+def selective_terms(terms, df_by_term: dict) -> list:
+    if not terms:
+        return []
+    rare = [term for term in terms if df_by_term.get(term, 0) <= SIMILAR_MAX_TERM_DF]
+    return rare or [min(terms, key=lambda term: df_by_term[term])]
+
+
+# Incremental update for one created/edited recipe (run as a background task).
+# IDF stays as of the last rebuild_all(); a recipe that drops out of another
+# recipe's list leaves that list one short until the next rebuild.
+# Refreshes run one at a time (an advisory lock shared with rebuild_all()):
+# overlapping recipes rewrite each other's lists, so concurrent ones would
+# insert the same rows or deadlock. Each is bounded by SIMILAR_MAX_CANDIDATES.
+def refresh_recipe(recipe_id: int, k: int = SIMILAR_RECIPES_K) -> None:
+    Similar = models.RecipeSimilarities
+    with SessionLocal() as db:
+        db.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": SIMILARITIES_LOCK_ID})
+        terms = db.execute(
+            select(models.Recipes.ingredient_terms).where(models.Recipes.id == recipe_id)
+        ).scalar()
+        if terms is None:
+            return  # deleted meanwhile; ON DELETE CASCADE removed its rows
+
+        db.execute(delete(Similar).where((Similar.recipe_id == recipe_id) | (Similar.similar_id == recipe_id)))
+
+        df_by_term = dict(db.execute(
+            select(models.RecipeTermIdf.term, models.RecipeTermIdf.df)
+            .where(models.RecipeTermIdf.term.in_(terms))
+        ).all()) if terms else {}
+        lookup = selective_terms(terms, df_by_term)
+        candidates = db.execute(
+            select(models.Recipes.id, models.Recipes.ingredient_terms)
+            .where(models.Recipes.ingredient_terms.overlap(lookup), models.Recipes.id != recipe_id)
+            .limit(SIMILAR_MAX_CANDIDATES)
+        ).all() if lookup else []
+
+        vocabulary = set(terms).union(*(c.ingredient_terms for c in candidates))
+        idf_by_term = dict(db.execute(
+            select(models.RecipeTermIdf.term, models.RecipeTermIdf.idf)
+            .where(models.RecipeTermIdf.term.in_(vocabulary))
+        ).all()) if vocabulary else {}
+        default_idf = db.execute(select(func.max(models.RecipeTermIdf.idf))).scalar() or 1.0
+
+        mine = term_weights(terms, idf_by_term, default_idf)
+        scored = []
+        for candidate in candidates:
+            theirs = term_weights(candidate.ingredient_terms, idf_by_term, default_idf)
+            score = sum(w * theirs[t] for t, w in mine.items() if t in theirs)
+            if score > 0:
+                scored.append((candidate.id, score))
+        scored.sort(key=lambda item: -item[1])
+
+        if scored:
+            db.execute(Similar.__table__.insert(), [
+                {"recipe_id": recipe_id, "similar_id": other, "score": score} for other, score in scored[:k]
+            ])
+
+            # Add this recipe to the lists it now belongs in, then trim them back to k
+            other_ids = [other for other, _ in scored]
+            lists = {
+                row.recipe_id: (row.entries, row.lowest)
+                for row in db.execute(
+                    select(Similar.recipe_id, func.count().label("entries"), func.min(Similar.score).label("lowest"))
+                    .where(Similar.recipe_id.in_(other_ids))
+                    .group_by(Similar.recipe_id)
+                )
+            }
+            joins = [
+                {"recipe_id": other, "similar_id": recipe_id, "score": score}
+                for other, score in scored
+                if lists.get(other, (0, 0.0))[0] < k or score > lists[other][1]
+            ]
+            if joins:
+                db.execute(Similar.__table__.insert(), joins)
+                db.execute(text("""
+                    DELETE FROM recipe_similarities s
+                    USING (
+                        SELECT recipe_id, similar_id,
+                               row_number() OVER (PARTITION BY recipe_id ORDER BY score DESC) AS position
+                        FROM recipe_similarities WHERE recipe_id = ANY(:ids)
+                    ) ranked
+                    WHERE s.recipe_id = ranked.recipe_id AND s.similar_id = ranked.similar_id
+                      AND ranked.position > :k
+                """), {"ids": [row["recipe_id"] for row in joins], "k": k})
+
+        db.commit()
+
+
+if __name__ == "__main__":
+    k = int(sys.argv[1]) if len(sys.argv) > 1 else SIMILAR_RECIPES_K
+    rebuild_all(k)
@@ -0,0 +1,94 @@
+# backend/responses.py
+# Fast JSON path for the listing endpoints
+#
+# Rows are validated into RecipeResponse models in one batch (a TypeAdapter
+# over the whole list, straight from the ORM objects), and the page is
+# encoded to bytes by pydantic-core in one call. This skips the per-row
+# model_dump() dicts and FastAPI's jsonable_encoder + json.dumps pass.
+#
+# Exports (/recipes/export, /favorites/export) are NDJSON, one recipe per
+# line, read from a server-side cursor EXPORT_BATCH_SIZE rows at a time.
+
+import os
+from typing import Iterable, Literal, Optional
+
+from fastapi import Response
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+from sqlalchemy.orm import joinedload, load_only, raiseload
+
+from backend import models, schemas
+from backend.database import AsyncSessionLocal
+from backend.http_cache import version_only
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+# summary = RecipeSummary (card data), full = RecipeResponse (with ingredients and steps)
+Fields = Literal["summary", "full"]
+
+RECIPE_LISTS = {
+    "summary": TypeAdapter(list[schemas.RecipeSummary]),
+    "full": TypeAdapter(list[schemas.RecipeResponse]),
+    "popular": TypeAdapter(list[schemas.PopularRecipe]),  # /recipes/popular only
+    "similar": TypeAdapter(list[schemas.SimilarRecipe]),  # /recipes/id/{id}/similar only
+}
+SUMMARY_COLUMNS = (
+    models.Recipes.id, models.Recipes.title, models.Recipes.image_url,
+    models.Recipes.created_by, models.Recipes.updated_at,
+)
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return to_json(content)
+
+
+# Loader options for a listing page query: the creator's name in the same
+# query, no lazy loads (an accidental N+1 raises instead of running), and
+# only the columns `fields` needs. Summary pages are complete after this one
+# query; full pages load just the ETag columns first, then the rest with
+# pagination.load_full_rows() when the client's copy is stale.
+def listing_options(fields: Fields) -> tuple:
+    columns = load_only(*SUMMARY_COLUMNS) if fields == "summary" else version_only(models.Recipes)
+    return (
+        columns,
+        creator_name(),
+        raiseload("*", sql_only=True),
+    )
+
+
+# Loader options for rows serialized as soon as they're read (no ETag check
+# first): the columns `fields` needs, the creator's name, no lazy loads
+def document_options(fields: Fields) -> tuple:
+    columns = (load_only(*SUMMARY_COLUMNS),) if fields == "summary" else ()
+    return (*columns, creator_name(), raiseload("*", sql_only=True))
+
+
+def creator_name():
+    return joinedload(models.Recipes.creator).load_only(models.Users.name)
+
+
+# Response models for ORM rows, with is_favourite set from `favorite_ids`
+# (or `favorite` for every row)
+def recipe_items(rows: Iterable, favorite_ids: Optional[set] = None,
+                 favorite: bool = False, fields: Fields = "full") -> list[schemas.RecipeSummary]:
+    rows = list(rows)
+    items = RECIPE_LISTS[fields].validate_python(rows, from_attributes=True)
+    for row, item in zip(rows, items):
+        item.is_favourite = favorite or (favorite_ids is not None and item.id in favorite_ids)
+        item.created_by_name = row.creator.name if row.creator else None  # see creator_name()
+    return items
+
+
+# NDJSON body for a select(Recipes, <is_favorite column>) built with
+# document_options(). Runs on its own session, open exactly as long as the
+# stream; only one batch of rows is in memory at a time.
+async def ndjson_recipes(statement, fields: Fields = "full"):
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for rows in result.partitions():
+            favorite_ids = {recipe.id for recipe, is_favorite in rows if is_favorite}
+            items = recipe_items((recipe for recipe, _ in rows), favorite_ids, fields=fields)
+            yield b"".join(to_json(item) + b"\n" for item in items)
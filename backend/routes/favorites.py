@@ -1,88 +1,136 @@
 # app/routes/favorites.py
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, literal, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from backend.database import get_db
-from backend.routes.users import get_current_user
-from backend import models, schemas
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.database import get_async_db
+from backend.routes.users import get_current_user_async
+from backend import models, recipe_cache
+from backend.popularity import adjust_favorite_count
+from backend.pagination import CountMode, count_rows, fetch_page, load_full_rows, page_response
+from backend.http_cache import cache_headers, conditional, rows_etag
+from backend.responses import (FastJSONResponse, Fields, document_options, listing_options, ndjson_recipes,
+                               recipe_items)
+from typing import Optional
 
 
 router = APIRouter(prefix="/favorites", tags=["favorites"])
 
 
 # Add to Favorites
+# One atomic upsert: the unique (user_id, recipe_id) index settles concurrent
+# adds, and the recipe foreign key reports a missing recipe
 @router.post("/{recipe_id}")
-def add_favorite(recipe_id: int, db: Session = Depends(get_db), user=Depends(get_current_user)):
-    recipe = db.query(models.Recipes).filter(models.Recipes.id == recipe_id).first()
-    if not recipe:
+async def add_favorite(recipe_id: int, db: AsyncSession = Depends(get_async_db), user=Depends(get_current_user_async)):
+    statement = (
+        insert(models.Favorites)
+        .values(user_id=user.id, recipe_id=recipe_id)
+        .on_conflict_do_nothing(index_elements=["user_id", "recipe_id"])
+        .returning(models.Favorites.id)
+    )
+    try:
+        added = (await db.execute(statement)).first()
+    except IntegrityError:
+        await db.rollback()
         raise HTTPException(status_code=404, detail="Recipe not found")
 
-    existing = db.query(models.Favorites).filter_by(user_id=user.id, recipe_id=recipe_id).first()
-    if existing:
+    if added is None:
         raise HTTPException(status_code=400, detail="Already in favorites")
 
-    fav = models.Favorites(user_id=user.id, recipe_id=recipe_id)
-    db.add(fav)
-    db.commit()
+    await adjust_favorite_count(db, recipe_id, 1)
+    await db.commit()
+    recipe_cache.forget_favorites(user.id)
     return {"message": "Added to favorites"}
 
 
 # Remove Favorite
 @router.delete("/{recipe_id}")
-def remove_favorite(recipe_id: int, db: Session = Depends(get_db), user=Depends(get_current_user)):
-    fav = db.query(models.Favorites).filter_by(user_id=user.id, recipe_id=recipe_id).first()
-    if not fav:
+async def remove_favorite(recipe_id: int, db: AsyncSession = Depends(get_async_db), user=Depends(get_current_user_async)):
+    statement = (
+        delete(models.Favorites)
+        .where(models.Favorites.user_id == user.id, models.Favorites.recipe_id == recipe_id)
+        .returning(models.Favorites.id)
+    )
+    if not (await db.execute(statement)).first():
         raise HTTPException(status_code=404, detail="Favorite not found")
 
-    db.delete(fav)
-    db.commit()
+    await adjust_favorite_count(db, recipe_id, -1)
+    await db.commit()
+    recipe_cache.forget_favorites(user.id)
     return {"message": "Removed from favorites"}
 
 
 # Get User Favorites
 @router.get("/", response_model=dict)
-def get_favorites(
+async def get_favorites(
+    request: Request,
     page: int = 1,
     page_size: int = 10,
-    db: Session = Depends(get_db),
-    user = Depends(get_current_user)
+    after: Optional[str] = None,
+    count: CountMode = "exact",
+    fields: Fields = "summary",
+    db: AsyncSession = Depends(get_async_db),
+    user = Depends(get_current_user_async)
 ):
-    skip = (page - 1) * page_size
-
     # Get favorites for the logged-in user
     fav_query = (
-        db.query(models.Recipes)
+        select(models.Recipes)
         .join(models.Favorites, models.Recipes.id == models.Favorites.recipe_id)
-        .filter(models.Favorites.user_id == user.id)
+        .where(models.Favorites.user_id == user.id)
     )
 
-    total = fav_query.count()
+    total = await count_rows(db, fav_query, count)
 
-    recipes = (
-        fav_query
-        .offset(skip)
-        .limit(page_size)
-        .all()
+    recipes, next_cursor = await fetch_page(
+        db, fav_query.options(*listing_options(fields)), models.Recipes.id, page, page_size, after
     )
 
-    response = []
-    for r in recipes:
-        item = schemas.RecipeResponse.model_validate(r).model_dump()
-        item["is_favorite"] = True  # Always true in this endpoint
-        response.append(item)
+    etag = rows_etag(recipes, total, page, page_size, next_cursor, fields)
+    not_modified = conditional(request, etag)
+    if not_modified:
+        return not_modified
+    if fields == "full":
+        await load_full_rows(db, models.Recipes, recipes)
 
-    return {
-        "page": page,
-        "page_size": page_size,
-        "total": total,
-        "total_pages": (total + page_size - 1) // page_size,
-        "recipes": response,
-    }
+    items = recipe_items(recipes, favorite=True, fields=fields)  # Always true in this endpoint
+    return FastJSONResponse(page_response(items, page, page_size, total, next_cursor),
+                            headers=cache_headers(etag))
+
+
+# All of the user's favorites as NDJSON (see /recipes/export)
+@router.get("/export")
+async def export_favorites(fields: Fields = "full", user=Depends(get_current_user_async)):
+    statement = (
+        select(models.Recipes, literal(True).label("is_favorite"))
+        .join(models.Favorites, models.Recipes.id == models.Favorites.recipe_id)
+        .where(models.Favorites.user_id == user.id)
+        .options(*document_options(fields))
+        .order_by(models.Recipes.id)
+    )
+    return StreamingResponse(ndjson_recipes(statement, fields), media_type="application/x-ndjson")
 
 
 # Is this recipe a favorite?
 def is_favorite_recipe(db: Session, user_id: int, recipe_id: int) -> bool:
-    return db.query(models.Favorites).filter(
-        models.Favorites.user_id == user_id,
-        models.Favorites.recipe_id == recipe_id
-    ).first() is not None
\ No newline at end of file
+    return recipe_id in favorite_recipe_ids(db, user_id, [recipe_id])
+
+
+# Which of these recipes are favorites? One query for a whole page of ids
+def favorite_recipe_ids(db: Session, user_id: int, recipe_ids) -> set[int]:
+    recipe_ids = list(recipe_ids)
+    if not recipe_ids:
+        return set()
+
+    rows = (
+        db.query(models.Favorites.recipe_id)
+        .filter(
+            models.Favorites.user_id == user_id,
+            models.Favorites.recipe_id.in_(recipe_ids)
+        )
+        .all()
+    )
+    return {row.recipe_id for row in rows}
\ No newline at end of file
@@ -0,0 +1,39 @@
+# backend/routes/images.py
+
+import os
+
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import FileResponse
+
+from backend import images
+from backend.http_cache import etag_matches, image_cache_control
+
+router = APIRouter(prefix="/images", tags=["images"])
+
+MEDIA_TYPES = {"webp": "image/webp", "jpg": "image/jpeg"}
+
+
+# Resized variant of an /images file, generated on first request if missing
+@router.get("/w/{width}/{filename}")
+async def image_variant(width: int, filename: str, request: Request):
+    stem, _, fmt = filename.rpartition(".")
+    if width not in images.VARIANT_WIDTHS or fmt not in images.VARIANT_FORMATS:
+        raise HTTPException(status_code=404, detail="Unknown image variant")
+    if not stem or stem.startswith(".") or "/" in stem or "\\" in stem:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    path = await images.ensure_variant(width, stem, fmt)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    # The original image when the variant couldn't be generated: revalidated,
+    # so clients pick up the variant if a later attempt succeeds
+    is_variant = path == images.variant_path(width, stem, fmt)
+    response = FileResponse(path, media_type=MEDIA_TYPES[fmt] if is_variant else None, stat_result=os.stat(path))
+    response.headers["Cache-Control"] = image_cache_control(filename) if is_variant else "no-cache"
+    if etag_matches(request, response.headers["etag"]):
+        return Response(status_code=304, headers={
+            "ETag": response.headers["etag"],
+            "Cache-Control": response.headers["Cache-Control"],
+        })
+    return response
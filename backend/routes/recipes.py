@@ -1,68 +1,91 @@
 # app/routes/recipes.py
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from sqlalchemy.orm import Session
-from backend import models, schemas
-from backend.database import get_db
-from backend.routes.users import get_current_user
-from huggingface_hub import InferenceClient
-import os, json
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFile, File, Form, Query, Request
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session, load_only, raiseload
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend import models, schemas, search, llm, uploads, images, recommendations, recipe_cache
+from backend.database import get_db, get_async_db
+from backend.routes.users import get_current_user, get_current_user_async
+import os, json, hashlib
 from dotenv import load_dotenv
-from backend.routes.favorites import is_favorite_recipe
-from typing import Optional
-
-from pydantic import BaseModel
+from backend.routes.favorites import favorite_recipe_ids
+from backend.pagination import (CountMode, count_rows, decode_cursor, encode_cursor, fetch_page,
+                                load_full_rows, page_response)
+from backend.http_cache import cache_headers, conditional, make_etag, rows_etag
+from backend.responses import (FastJSONResponse, Fields, SUMMARY_COLUMNS, creator_name, document_options,
+                               listing_options, ndjson_recipes, recipe_items)
+from typing import Literal, Optional
+from backend.ingredients import ingredient_terms
+from backend.cache import Cache, make_backend
+from backend.json_stream import RecipeStreamParser
+from fastapi.responses import StreamingResponse
+
+from pydantic import BaseModel, TypeAdapter
 
 class SuggestRequest(BaseModel):
     ingredients: list[str]
 
 router = APIRouter(
     prefix="/recipes", 
-    tags=["recipes"]
+    tags=["recipes"],
+    route_class=uploads.UploadRoute  # size limits for the image upload in create
 )
 
 load_dotenv()
-HF_API_TOKEN = os.getenv("HF_API_TOKEN")
 
-client = InferenceClient(api_key=HF_API_TOKEN)
+# Most ids accepted by one /recipes/batch request
+RECIPE_BATCH_MAX_IDS = int(os.getenv("RECIPE_BATCH_MAX_IDS", "500"))
+
+# Generation settings for suggest-recipes; part of the cache key
+SUGGEST_MODEL = "Qwen/Qwen2.5-7B-Instruct-1M:featherless-ai"
+SUGGEST_MAX_TOKENS = 800
+SUGGEST_TEMPERATURE = 0.5
+
+# Cache of AI suggestions: in-process by default, shared if SUGGEST_CACHE_URL=redis://...
+suggest_cache = Cache(
+    "suggest",
+    make_backend(os.getenv("SUGGEST_CACHE_URL"), int(os.getenv("SUGGEST_CACHE_SIZE", "1000"))),
+    ttl=float(os.getenv("SUGGEST_CACHE_TTL", "86400")),
+)
 
 # Create Recipe
 @router.post("/", response_model=schemas.RecipeResponse)
-def create(title: str = Form(...),
+async def create(background_tasks: BackgroundTasks,
+            title: str = Form(...),
             ingredients: list[str] = Form(...),
             steps: str = Form(...),
             file: UploadFile = File(None),
-            db: Session = Depends(get_db),
-            user = Depends(get_current_user)):
+            db: AsyncSession = Depends(get_async_db),
+            user = Depends(get_current_user_async)):
     # Prevent duplicates
-    existing = (
-        db.query(models.Recipes)
-        .filter(models.Recipes.title == title)
-        .first()
+    existing = await db.execute(
+        select(models.Recipes.id)
+        .where(models.Recipes.title == title)
+        .limit(1)
     )
 
-    if existing:
+    if existing.first():
         raise HTTPException(400, detail="Recipe already saved")
     
     #saving the image if one was uploaded
-    # --- Save optional uploaded file ---
-    if file:
-        upload_dir = os.path.join('backend', 'data', 'Food_Images', 'Food_Images')
-        upload_path = os.path.join(upload_dir, file.filename)
-        with open(upload_path, "wb") as buffer:
-            buffer.write(file.file.read())
+    # --- Save optional uploaded file (streamed, stored under its content hash) ---
+    image_url = await uploads.save_image(file) if file else None
+    images.schedule_variants(image_url)
 
     new_recipe = models.Recipes(
         title=title,
         ingredients=ingredients,
         steps=steps,
-        image_url= "/images/"+file.filename,#recipe.image_url,
+        image_url=image_url,
         created_by=user.id
     )
 
     db.add(new_recipe)
-    db.commit()
-    db.refresh(new_recipe)
+    await db.commit()
+    await db.refresh(new_recipe)
+    recipe_cache.bump_listings()
+    background_tasks.add_task(recommendations.refresh_recipe, new_recipe.id)
 
     # #Add it to favorites
     # favorite = models.Favorites(
@@ -79,58 +102,166 @@ def create(title: str = Form(...),
 
 # List Recipes
 @router.get("/", response_model=dict)
-def list_recipes(
+async def list_recipes(
+    request: Request,
     page: int = 1,        # page number (1-based)
     page_size: int = 10,  # items per page
-    db: Session = Depends(get_db),
-    user=Depends(get_current_user)
+    after: Optional[str] = None,  # next_cursor of the previous page (keyset mode)
+    count: CountMode = "exact",   # exact | estimated | none
+    fields: Fields = "summary",   # summary (card data) | full (with ingredients and steps)
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(get_current_user_async)
 ):
-    # Calculate offset
-    skip = (page - 1) * page_size
+    if recipe_cache.cacheable_page(page, page_size, after):
+        return await cached_listing(request, page, page_size, count, fields, user)
 
-    recipes = (
-        db.query(models.Recipes)
-        .offset(skip)
-        .limit(page_size)
-        .all()
+    query = select(models.Recipes)
+
+    # Only the columns `fields` needs (full pages: just enough for the ETag, the rest on a miss)
+    recipes, next_cursor = await fetch_page(
+        db, query.options(*listing_options(fields)), models.Recipes.id, page, page_size, after
     )
+    total = await count_rows(db, query, count)
 
-    total = db.query(models.Recipes).count()
+    favorite_ids = await db.run_sync(favorite_recipe_ids, user.id, [r.id for r in recipes])
+
+    etag = rows_etag(recipes, sorted(favorite_ids), total, page, page_size, next_cursor, fields)
+    not_modified = conditional(request, etag)
+    if not_modified:
+        return not_modified
+    if fields == "full":
+        await load_full_rows(db, models.Recipes, recipes)
+
+    items = recipe_items(recipes, favorite_ids, fields=fields)
+    return FastJSONResponse(page_response(items, page, page_size, total, next_cursor),
+                            headers=cache_headers(etag))
+
+
+# First pages of list_recipes, from the recipe cache
+async def cached_listing(request: Request, page: int, page_size: int, count: CountMode, fields: Fields, user):
+    cached = await recipe_cache.listing_page(page, page_size, count, fields)
+    body = cached["page"]
+    favorite_ids = await recipe_cache.favorite_ids(user.id)
+    favorite_ids = sorted(item["id"] for item in body["recipes"] if item["id"] in favorite_ids)
+
+    etag = make_etag(cached["etag"], favorite_ids)
+    not_modified = conditional(request, etag)
+    if not_modified:
+        return not_modified
+
+    items = [recipe_cache.with_favorite(item, item["id"] in favorite_ids) for item in body["recipes"]]
+    return FastJSONResponse({**body, "recipes": items}, headers=cache_headers(etag))
+
+
+# ?ids=1,2,3 and/or ?ids=1&ids=2 -> [1, 2, 3], first occurrence order
+def parse_ids(values: list[str]) -> list[int]:
+    try:
+        ids = [int(v) for value in values for v in value.split(",") if v.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be integers")
+
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > RECIPE_BATCH_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {RECIPE_BATCH_MAX_IDS} ids per request")
+    return ids
+
+
+# Several recipes by id in one query. Recipes come back in the order asked
+# for; ids that don't exist are listed in "missing".
+@router.get("/batch")
+async def batch_recipes(
+    request: Request,
+    ids: list[str] = Query(...),
+    fields: Fields = "full",
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(get_current_user_async)
+):
+    recipe_ids = parse_ids(ids)
+    rows = (await db.execute(
+        select(models.Recipes)
+        .options(*document_options(fields))
+        .where(models.Recipes.id.in_(recipe_ids))
+    )).scalars().all()
+    by_id = {r.id: r for r in rows}
+    recipes = [by_id[i] for i in recipe_ids if i in by_id]
+    missing = [i for i in recipe_ids if i not in by_id]
+
+    favorite_ids = await db.run_sync(favorite_recipe_ids, user.id, by_id)
+
+    etag = rows_etag(recipes, sorted(favorite_ids), missing, fields)
+    not_modified = conditional(request, etag)
+    if not_modified:
+        return not_modified
+
+    items = recipe_items(recipes, favorite_ids, fields=fields)
+    return FastJSONResponse({"recipes": items, "missing": missing}, headers=cache_headers(etag))
+
+
+# Whole catalog as NDJSON, one recipe per line in id order, streamed from a
+# server-side cursor so memory stays flat whatever the catalog size
+@router.get("/export")
+async def export_recipes(fields: Fields = "full", user=Depends(get_current_user_async)):
+    favorited = (
+        select(models.Favorites.id)
+        .where(models.Favorites.user_id == user.id, models.Favorites.recipe_id == models.Recipes.id)
+        .exists()
+    )
+    statement = (
+        select(models.Recipes, favorited.label("is_favorite"))
+        .options(*document_options(fields))
+        .order_by(models.Recipes.id)
+    )
+    return StreamingResponse(ndjson_recipes(statement, fields), media_type="application/x-ndjson")
 
-    response = []
-    for r in recipes:
-        item = schemas.RecipeResponse.model_validate(r).model_dump()
-        item["is_favorite"] = is_favorite_recipe(db, user.id, r.id)
-        response.append(item)
-
-    return {
-        "page": page,
-        "page_size": page_size,
-        "total": total,
-        "total_pages": (total + page_size - 1) // page_size,
-        "recipes": response,
-    }
 
 # Get Single Recipe
+# Served from the recipe cache (backend/recipe_cache.py), with the user's favorite flag overlaid
 @router.get("/id/{recipe_id}")
-def get_recipe(recipe_id: int, db: Session = Depends(get_db), user=Depends(get_current_user)):
-    recipe = db.query(models.Recipes).filter(models.Recipes.id == recipe_id).first()
-    if not recipe:
+async def get_recipe(recipe_id: int, request: Request, user=Depends(get_current_user_async)):
+    document = await recipe_cache.recipe_document(recipe_id)
+    if not document:
         raise HTTPException(status_code=404, detail="Recipe not found")
 
-    data = schemas.RecipeResponse.model_validate(recipe).model_dump()
-    data["is_favorite"] = is_favorite_recipe(db, user.id, recipe_id)
-    if not recipe.creator:
-        data["created_by_name"] = None
-    else:
-        
-        data["created_by_name"] = recipe.creator.name
-    return data
+    is_favorite = recipe_id in await recipe_cache.favorite_ids(user.id)
+    etag = make_etag(document["etag"], is_favorite)
+    not_modified = conditional(request, etag)
+    if not_modified:
+        return not_modified
+
+    return FastJSONResponse(recipe_cache.with_favorite(document["recipe"], is_favorite),
+                            headers=cache_headers(etag))
+
+
+# "More like this": precomputed neighbours (backend/recommendations.py), best first
+@router.get("/id/{recipe_id}/similar")
+async def similar_recipes(recipe_id: int, limit: int = 10, db: AsyncSession = Depends(get_async_db),
+                          user=Depends(get_current_user_async)):
+    limit = max(1, min(limit, recommendations.SIMILAR_RECIPES_K))
+    Similar = models.RecipeSimilarities
+    rows = (await db.execute(
+        select(models.Recipes, Similar.score)
+        .join(Similar, Similar.similar_id == models.Recipes.id)
+        .options(load_only(*SUMMARY_COLUMNS), creator_name(), raiseload("*", sql_only=True))
+        .where(Similar.recipe_id == recipe_id)
+        .order_by(Similar.score.desc())
+        .limit(limit)
+    )).all()
+
+    if not rows and not (await db.execute(select(models.Recipes.id).where(models.Recipes.id == recipe_id))).first():
+        raise HTTPException(status_code=404, detail="Recipe not found")
+
+    recipes = [recipe for recipe, _ in rows]
+    favorite_ids = await db.run_sync(favorite_recipe_ids, user.id, [r.id for r in recipes])
+    items = recipe_items(recipes, favorite_ids, fields="similar")
+    for item, (_, score) in zip(items, rows):
+        item.similarity = round(score, 4)
+    return FastJSONResponse({"recipe_id": recipe_id, "recipes": items})
 
 
 # Update Recipe
-@router.put("/id/{recipe_id}")
-def update(recipe_id: int, update_data: schemas.RecipeUpdate, db: Session = Depends(get_db), user=Depends(get_current_user)):
+@router.put("/id/{recipe_id}", response_model=schemas.RecipeResponse)
+def update(recipe_id: int, update_data: schemas.RecipeUpdate, background_tasks: BackgroundTasks,
+           db: Session = Depends(get_db), user=Depends(get_current_user)):
     recipe = db.query(models.Recipes).filter(models.Recipes.id == recipe_id).first()
 
     if not recipe:
@@ -139,12 +270,24 @@ def update(recipe_id: int, update_data: schemas.RecipeUpdate, db: Session = Depe
     if recipe.created_by != user.id:
         raise HTTPException(status_code=403, detail="Not allowed to modify this recipe")
 
-    for key, value in update_data.model_dump(): #.items():
+    # Only the fields that were sent; setting ingredients also refreshes ingredient_terms
+    changes = update_data.model_dump(exclude_unset=True)
+    for key, value in changes.items():
         setattr(recipe, key, value)
 
     db.commit()
-    db.refresh(recipe)
-    return recipe
+    recipe_cache.forget_recipe(recipe_id)
+    if "ingredients" in changes:
+        background_tasks.add_task(recommendations.refresh_recipe, recipe_id)
+
+    # Same document get_recipe serves, not the ORM row (ingredient_terms etc.)
+    recipe = (
+        db.query(models.Recipes)
+        .options(*document_options("full"))
+        .filter(models.Recipes.id == recipe_id)
+        .one()
+    )
+    return recipe_items([recipe], favorite_recipe_ids(db, user.id, [recipe_id]))[0]
 
 
 # Delete Recipe
@@ -160,48 +303,187 @@ def delete(recipe_id: int, db: Session = Depends(get_db), user=Depends(get_curre
 
     db.delete(recipe)
     db.commit()
+    recipe_cache.forget_recipe(recipe_id)
     return {"message": "Recipe deleted"}
 
-# searching based on the title TODO: Search db based on ingredients
+# Search by title/steps text (ranked, typo tolerant) and/or required ingredients
 @router.get("/search")
-def search_recipes(
-    q: str,
+async def search_recipes(
+    request: Request,
+    q: str = "",
+    ingredient: list[str] = Query(default=[]),  # ?ingredient=eggs&ingredient=milk
+    page: int = 1,
+    page_size: int = 10,
+    after: Optional[str] = None,
+    count: CountMode = "exact",
+    fields: Fields = "summary",
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(get_current_user_async)
+):
+    q = q.strip()
+    query = select(models.Recipes)
+    rank = None
+
+    if q:
+        query = query.where(search.text_filter(q))
+        rank = search.text_rank(q)
+    if ingredient:
+        query = query.where(search.ingredients_filter(ingredient))
+
+    results, next_cursor = await fetch_page(
+        db, query.options(*listing_options(fields)), models.Recipes.id, page, page_size, after, rank=rank
+    )
+    total = await count_rows(db, query, count)
+
+    favorite_ids = await db.run_sync(favorite_recipe_ids, user.id, [r.id for r in results])
+
+    etag = rows_etag(results, sorted(favorite_ids), total, page, page_size, next_cursor, q, fields)
+    not_modified = conditional(request, etag)
+    if not_modified:
+        return not_modified
+    if fields == "full":
+        await load_full_rows(db, models.Recipes, results)
+
+    items = recipe_items(results, favorite_ids, fields=fields)
+    return FastJSONResponse(page_response(items, page, page_size, total, next_cursor, query=q),
+                            headers=cache_headers(etag))
+
+
+# Most favorited recipes. Ordered by (favorite_count, id) descending so both the
+# page and the cursor condition are one backwards range scan of ix_recipes_popular.
+@router.get("/popular")
+async def popular_recipes(
     page: int = 1,
     page_size: int = 10,
+    after: Optional[str] = None,  # next_cursor of the previous page
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(get_current_user_async)
+):
+    count = models.Recipes.favorite_count
+    query = (
+        select(models.Recipes)
+        .options(load_only(*SUMMARY_COLUMNS, count), creator_name(), raiseload("*", sql_only=True))
+        .order_by(count.desc(), models.Recipes.id.desc())
+    )
+    if after:
+        cursor = decode_cursor(after)
+        if "rank" not in cursor:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(tuple_(count, models.Recipes.id) < tuple_(cursor["rank"], cursor["id"]))
+    else:
+        query = query.offset((page - 1) * page_size)
+
+    recipes = (await db.execute(query.limit(page_size + 1))).scalars().all()
+    next_cursor = None
+    if len(recipes) > page_size:
+        recipes = recipes[:page_size]
+        next_cursor = encode_cursor({"id": recipes[-1].id, "rank": recipes[-1].favorite_count})
+
+    favorite_ids = await db.run_sync(favorite_recipe_ids, user.id, [r.id for r in recipes])
+    items = recipe_items(recipes, favorite_ids, fields="popular")
+    return FastJSONResponse(page_response(items, page, page_size, None, next_cursor))
+
+
+# Rank existing recipes by how much of the given ingredients they use (no AI call)
+@router.post("/match")
+def match_recipes(
+    req: SuggestRequest,
+    rank_by: Literal["coverage", "overlap"] = "coverage",
+    limit: int = 10,
     db: Session = Depends(get_db),
     user=Depends(get_current_user)
 ):
-    skip = (page - 1) * page_size
+    terms = ingredient_terms(req.ingredients)
+    if not terms:
+        return {"ingredients": [], "recipes": []}
+
+    matched = search.matched_count(terms)
+    coverage = search.coverage(matched)
+    if rank_by == "coverage":
+        order = (coverage.desc(), matched.desc())
+    else:
+        order = (matched.desc(), coverage.desc())
 
-    query = db.query(models.Recipes).filter(
-        models.Recipes.title.ilike(f"%{q}%")
+    results = (
+        db.query(models.Recipes)
+        .options(
+            load_only(*SUMMARY_COLUMNS, models.Recipes.ingredients, models.Recipes.steps,
+                      models.Recipes.ingredient_terms),
+            creator_name(),
+            raiseload("*", sql_only=True),
+        )
+        .filter(search.overlap_filter(terms))
+        .order_by(*order, models.Recipes.id)
+        .limit(limit)
+        .all()
     )
 
-    results = query.offset(skip).limit(page_size).all()
-    total = query.count()
+    favorite_ids = favorite_recipe_ids(db, user.id, [r.id for r in results])
+    have = set(terms)
 
     response = []
-    for r in results:
-        item = schemas.RecipeResponse.model_validate(r).model_dump()
-        item["is_favorite"] = is_favorite_recipe(db, user.id, r.id)
-        response.append(item)
+    for r, item in zip(results, recipe_items(results, favorite_ids)):
+        matched = [t for t in r.ingredient_terms if t in have]
+        response.append({
+            **item.model_dump(mode="json"),
+            "matched_ingredients": matched,
+            "missing_ingredients": [t for t in r.ingredient_terms if t not in have],
+            "coverage": len(matched) / max(len(r.ingredient_terms), 1),
+        })
 
-    return {
-        "query": q,
-        "page": page,
-        "page_size": page_size,
-        "total": total,
-        "total_pages": (total + page_size - 1) // page_size,
-        "recipes": response,
-    }
+    return FastJSONResponse({"ingredients": terms, "recipes": response})
 
 
 # AI ingredients creation
 @router.post("/suggest-recipes")
-def suggest(req: SuggestRequest):
+async def suggest(req: SuggestRequest):
+    ingredients = normalize_suggest_ingredients(req.ingredients)
+    key = suggest_cache_key(ingredients)
 
-    prompt = f"""
-    Generate exactly 1 recipe idea using ONLY these ingredients: {", ".join(req.ingredients)}.
+    recipes = await suggest_cache.aget_or_compute(key, lambda: generate_recipes(ingredients))
+    return {"recipes": recipes}
+
+
+# Same as suggest-recipes, but streamed as NDJSON events while the model writes:
+#   {"type": "token", "text": ...}            raw model output
+#   {"type": "field", "name": ..., "value": ...} a recipe field is complete
+#   {"type": "recipe", "recipe": {...}}       final recipe, validated
+#   {"type": "error", "detail": ...}
+@router.post("/suggest-recipes/stream")
+async def suggest_stream(req: SuggestRequest):
+    ingredients = normalize_suggest_ingredients(req.ingredients)
+    key = suggest_cache_key(ingredients)
+
+    cached = suggest_cache.get(key)
+    if not cached:
+        llm.upstream.check()  # shed load with a real 503 before the stream starts
+
+    return StreamingResponse(
+        suggestion_events(ingredients, key, cached),
+        media_type="application/x-ndjson",
+    )
+
+
+# Hit/miss counters for the suggestion cache and upstream load
+@router.get("/suggest-recipes/cache")
+def suggest_cache_stats():
+    return {**suggest_cache.stats(), "upstream": llm.upstream.stats()}
+
+
+# Same ingredients in any order/case share one cache entry
+def normalize_suggest_ingredients(ingredients: list[str]) -> list[str]:
+    return sorted({i.strip().lower() for i in ingredients if i.strip()})
+
+
+def suggest_cache_key(ingredients: list[str]) -> str:
+    return hashlib.sha256(json.dumps(
+        [ingredients, SUGGEST_MODEL, SUGGEST_MAX_TOKENS, SUGGEST_TEMPERATURE]
+    ).encode()).hexdigest()
+
+
+def suggest_prompt(ingredients: list[str]) -> str:
+    return f"""
+    Generate exactly 1 recipe idea using ONLY these ingredients: {", ".join(ingredients)}.
 
     Return ONLY valid JSON. Format EXACTLY like this:
 
@@ -217,23 +499,75 @@ def suggest(req: SuggestRequest):
     No markdown. No explanations.
     """
 
-    completion = client.chat.completions.create(
-        model="Qwen/Qwen2.5-7B-Instruct-1M:featherless-ai",
-        messages=[{"role": "user", "content": prompt}],
-        max_tokens=800,
-        temperature=0.5
-    )
 
-    raw = completion.choices[0].message["content"]
+SUGGESTED_RECIPES = TypeAdapter(list[schemas.SaveRecipeRequest])
+
+
+# Model output (or a cached entry) as a list of recipe dicts. Anything that
+# isn't a non-empty list of valid recipes raises ValueError (pydantic's
+# ValidationError is one), so it's never cached or replayed.
+def suggested_recipes(data) -> list[dict]:
+    recipes = SUGGESTED_RECIPES.validate_python(data)
+    if not recipes:
+        raise ValueError("no recipes")
+    return [recipe.model_dump(exclude={"created_by"}) for recipe in recipes]
+
+
+async def generate_recipes(ingredients: list[str]):
+    raw = await llm.complete(
+        suggest_prompt(ingredients),
+        model=SUGGEST_MODEL,
+        max_tokens=SUGGEST_MAX_TOKENS,
+        temperature=SUGGEST_TEMPERATURE
+    )
 
     # print(raw)
-    # Parse JSON safely
+    # Invalid answers raise here, inside the single-flight, so they are never cached
     try:
-        recipes = json.loads(raw)
-    except Exception:
+        return suggested_recipes(json.loads(raw))
+    except ValueError:  # includes json's JSONDecodeError
         raise HTTPException(500, detail="AI returned invalid JSON")
 
-    return {"recipes": recipes}
+
+async def suggestion_events(ingredients: list[str], key: str, cached):
+    def event(**data) -> str:
+        return json.dumps(data) + "\n"
+
+    # Cache hit: replay the stored recipe as fields, no upstream call. An entry
+    # that isn't a valid recipe is dropped and the model is asked again.
+    if cached:
+        try:
+            recipe = suggested_recipes(cached)[0]
+        except ValueError:
+            suggest_cache.delete(key)
+        else:
+            for name, value in recipe.items():
+                yield event(type="field", name=name, value=value)
+            yield event(type="recipe", recipe=recipe)
+            return
+
+    parser = RecipeStreamParser()
+    try:
+        async for text in llm.stream(
+            suggest_prompt(ingredients),
+            model=SUGGEST_MODEL,
+            max_tokens=SUGGEST_MAX_TOKENS,
+            temperature=SUGGEST_TEMPERATURE
+        ):
+            yield event(type="token", text=text)
+            for name, value in parser.feed(text):
+                yield event(type="field", name=name, value=value)
+
+        recipe = suggested_recipes([parser.result()])[0]
+    except HTTPException as exc:
+        yield event(type="error", detail=exc.detail)
+        return
+    except (ValueError, TypeError):  # includes pydantic's ValidationError
+        yield event(type="error", detail="AI returned invalid JSON")
+        return
+
+    suggest_cache.set(key, [recipe])
+    yield event(type="recipe", recipe=recipe)
 
 # # if AI generated receipe needs to be saved.
 # @router.post("/save-recipe")
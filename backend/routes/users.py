@@ -1,15 +1,17 @@
 # backend/routes/users.py
 
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from datetime import datetime, timedelta, timezone
-from passlib.context import CryptContext
 import jwt, os
 from dotenv import load_dotenv
 
-from backend import models, schemas
-from backend.database import get_db
+from backend import models, schemas, passwords, metrics
+from backend.cache import Cache, make_backend
+from backend.database import get_db, get_async_db, env_flag
 
 router = APIRouter(
     prefix="/users", 
@@ -21,17 +23,20 @@ SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="users/login")
 
+# Resolved users by token subject (email), so auth doesn't query users on every request
+user_cache = Cache(
+    "users",
+    make_backend(os.getenv("USER_CACHE_URL"), int(os.getenv("USER_CACHE_SIZE", "10000"))),
+    ttl=float(os.getenv("USER_CACHE_TTL", "300")),
+)
+# Trust the uid/name claims of our own signed tokens and skip the lookup entirely.
+# A deleted user then keeps access until their token expires.
+AUTH_TRUST_TOKEN_CLAIMS = env_flag("AUTH_TRUST_TOKEN_CLAIMS", False)
 
-# Utilities
-def hash_password(password: str):
-    return pwd_context.hash(password)
-
-def verify_password(plain: str, hashed: str):
-    return pwd_context.verify(plain, hashed)
 
+# Utilities (password hashing lives in backend/passwords.py)
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -39,7 +44,7 @@ def create_access_token(data: dict):
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+def token_claims(token: str) -> dict:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email = payload.get("sub")
@@ -47,39 +52,104 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
             raise HTTPException(status_code=401, detail="Invalid token")
     except:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
+    return payload
+
+
+# Resolves the user without touching the database when possible:
+# trusted token claims first, then the user cache
+def cached_user(claims: dict):
+    if AUTH_TRUST_TOKEN_CLAIMS and "uid" in claims and "name" in claims:
+        return schemas.CurrentUser(id=claims["uid"], name=claims["name"], email=claims["sub"])
+
+    cached = user_cache.get(claims["sub"])
+    if cached is not None:
+        return schemas.CurrentUser(**cached)
+    return None
 
-    user = db.query(models.Users).filter(models.Users.email == email).first()
+
+def remember_user(user) -> schemas.CurrentUser:
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return user
+    current = schemas.CurrentUser.model_validate(user)
+    user_cache.set(current.email, current.model_dump())
+    return current
+
+
+# Call whenever a user's row changes (name, email, deletion)
+def invalidate_user(email: str) -> None:
+    user_cache.delete(email)
+
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    with metrics.phase("auth"):
+        claims = token_claims(token)
+        user = cached_user(claims)
+        if user:
+            return user
+
+        user = db.query(models.Users).filter(models.Users.email == claims["sub"]).first()
+        return remember_user(user)
+
+
+# Same as get_current_user, for routes running on the async session
+async def get_current_user_async(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    with metrics.phase("auth"):
+        claims = token_claims(token)
+        user = cached_user(claims)
+        if user:
+            return user
+
+        result = await db.execute(select(models.Users).where(models.Users.email == claims["sub"]))
+        return remember_user(result.scalars().first())
 
 
 # Endpoints
 @router.post("/register")
-def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
+async def register(user: schemas.UserCreate, db: AsyncSession = Depends(get_async_db)):
+    # Hash before the session takes a connection: the hash may wait its turn
+    # on the bcrypt pool, and holding a connection meanwhile would let a
+    # burst of sign-ups drain the database pool for every other request
+    password_hash = await passwords.hash_password(user.password)
+
     # Email has to be unique
-    exists = db.query(models.Users).filter(models.Users.email == user.email).first()
-    if exists:
+    result = await db.execute(select(models.Users).where(models.Users.email == user.email))
+    if result.scalars().first():
         raise HTTPException(status_code=400, detail="Email already registered")
 
     new_user = models.Users(
         name=user.name,
         email=user.email,
-        password_hash=hash_password(user.password)
+        password_hash=password_hash
     )
 
     db.add(new_user)
-    db.commit()
+    await db.commit()
+    invalidate_user(new_user.email)
     return {"message": "User registered"}
 
 
 @router.post("/login")
-def login(form: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(models.Users).filter(models.Users.email == form.username).first()
-    if not user or not verify_password(form.password, user.password_hash):
+async def login(form: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(select(models.Users).where(models.Users.email == form.username))
+    user = result.scalars().first()
+    if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    token = create_access_token({"sub": user.email})
+    # Give the connection back while the hash waits on the bcrypt pool (see
+    # register); close() detaches `user` with its attributes still loaded
+    await db.close()
+
+    valid, new_hash = await passwords.verify_password(form.password, user.password_hash)
+    if not valid:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+
+    # Stored hash uses an old cost factor: replace it now that we have the password
+    if new_hash:
+        await db.execute(update(models.Users).where(models.Users.id == user.id).values(password_hash=new_hash))
+        await db.commit()
+
+    # uid/name let get_current_user skip the user lookup (AUTH_TRUST_TOKEN_CLAIMS)
+    token = create_access_token({"sub": user.email, "uid": user.id, "name": user.name})
     return {"access_token": token, 
             "token_type": "bearer", 
             "user_id": user.id, 
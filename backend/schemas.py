@@ -1,8 +1,10 @@
 # app/schemas.py
-from pydantic import BaseModel, EmailStr, field_validator
-from typing import List, Optional
+from pydantic import BaseModel, EmailStr, computed_field, field_validator
+from typing import Dict, List, Optional
 import re
 
+from backend.images import variant_urls
+
 class UserCreate(BaseModel):
     name: str
     email: EmailStr
@@ -12,6 +14,16 @@ class UserCreate(BaseModel):
     def check_password_strength(cls, v):
         return validate_password(v)
 
+# The authenticated user as seen by the routes (cached, so no ORM object)
+class CurrentUser(BaseModel):
+    id: int
+    name: str
+    email: str
+
+    model_config = {
+        "from_attributes": True
+    }
+
 class RecipeBase(BaseModel):
     title: str
     ingredients: List[str] = None
@@ -27,16 +39,41 @@ class RecipeUpdate(BaseModel):
     steps: Optional[str] = None
     image_url: Optional[str] = None
 
-class RecipeResponse(RecipeBase):
+# What a recipe card needs; listing pages return these by default (?fields=summary)
+class RecipeSummary(BaseModel):
     id: int
+    title: str
+    image_url: Optional[str] = None
     created_by: Optional[int] = None
     created_by_name: Optional[str] = None
     is_favourite: bool = False
+
+    # The spelling the frontend reads
+    @computed_field
+    @property
+    def is_favorite(self) -> bool:
+        return self.is_favourite
+
+    # Resized WebP versions of image_url by width, for card thumbnails and srcset
+    @computed_field
+    @property
+    def image_variants(self) -> Optional[Dict[str, str]]:
+        return variant_urls(self.image_url)
     
     model_config = {
         "from_attributes": True
     }
 
+class PopularRecipe(RecipeSummary):
+    favorite_count: int = 0
+
+class SimilarRecipe(RecipeSummary):
+    similarity: float = 0.0
+
+class RecipeResponse(RecipeSummary):
+    ingredients: List[str] = None
+    steps: str
+
 class SaveRecipeRequest(BaseModel):
     title: str
     ingredients: list[str] = None
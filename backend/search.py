@@ -0,0 +1,71 @@
+# backend/search.py
+# Recipe search expressions, all answered from indexes on the recipes table:
+#   - full-text match on search_vector (GIN, title + steps)
+#   - substring / fuzzy match on title (GIN trigram index, pg_trgm)
+#   - ingredient containment/overlap on the normalized ingredient_terms array (GIN)
+
+from sqlalchemy import String, any_, cast, false, func, or_, select
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from backend import models
+from backend.ingredients import ingredient_terms
+
+
+def _escape_like(q: str) -> str:
+    return q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def text_query(q: str):
+    # websearch syntax: plain words, "quoted phrases", -excluded, or
+    return func.websearch_to_tsquery("english", q)
+
+
+# Rows matching the search text, either by words, title substring or a fuzzy title match
+def text_filter(q: str):
+    return or_(
+        models.Recipes.search_vector.op("@@")(text_query(q)),
+        models.Recipes.title.ilike(f"%{_escape_like(q)}%", escape="\\"),
+        models.Recipes.title.op("%")(q),  # trigram similarity above pg_trgm.similarity_threshold
+    )
+
+
+# Relevance: text rank (title weighted above steps) plus title similarity for typos
+def text_rank(q: str):
+    return (
+        func.ts_rank_cd(models.Recipes.search_vector, text_query(q))
+        + func.similarity(models.Recipes.title, q)
+    )
+
+
+# Recipes that contain every one of the given ingredients ("eggs" matches "2 large eggs").
+# Input that normalizes to no terms (staples like salt, blanks) matches no
+# recipe: containing [] would be true for all of them.
+def ingredients_filter(ingredients: list[str]):
+    terms = ingredient_terms(ingredients)
+    if not terms:
+        return false()
+    return models.Recipes.ingredient_terms.contains(terms)
+
+
+# --- "Cook with what I have" matching, on already normalized terms ---
+
+# Recipes using at least one of the terms (array overlap, GIN indexed)
+def overlap_filter(terms: list[str]):
+    return models.Recipes.ingredient_terms.overlap(cast(terms, ARRAY(String)))
+
+
+# How many of the terms each recipe uses
+def matched_count(terms: list[str]):
+    term = func.unnest(models.Recipes.ingredient_terms).table_valued("term").render_derived()
+    return (
+        select(func.count())
+        .select_from(term)
+        .where(term.c.term == any_(cast(terms, ARRAY(String))))
+        .correlate(models.Recipes)
+        .scalar_subquery()
+    )
+
+
+# Share of the recipe's own ingredients that are covered by the terms
+def coverage(matched):
+    return matched * 1.0 / func.greatest(func.cardinality(models.Recipes.ingredient_terms), 1)
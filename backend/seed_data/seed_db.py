@@ -1,32 +1,143 @@
+# Bulk loader for the Kaggle recipes CSV (and larger catalog imports in the same format)
+#
+# The CSV is streamed in fixed-size batches. Each batch is COPY'd into a temp
+# staging table and moved into recipes with INSERT ... ON CONFLICT DO NOTHING,
+# then committed, so memory stays flat and a re-run (or a run resumed after a
+# crash) skips the rows that are already in the table.
+#
+#   python -m backend.seed_data.seed_db [--csv path] [--batch-size 5000]
+
+import argparse
+import ast
 import csv
-from sqlalchemy.orm import Session
-from backend import models
-from backend.database import SessionLocal
+import io
 import os
-import ast
+import re
+import sys
+import time
+from itertools import islice
+
+from backend.database import engine
+from backend.ingredients import ingredient_terms
+
+DEFAULT_CSV = os.path.join('backend', 'data', 'recipes.csv')
+DEFAULT_BATCH_SIZE = 5000
+
+COLUMNS = ("title", "ingredients", "ingredient_terms", "steps", "image_url")
+
+# A Python list literal of quoted strings: ['item1', "item 2"]
+_ITEM = r"""'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*\""""
+_LIST = re.compile(rf"\[\s*(?:(?:{_ITEM})\s*(?:,\s*(?:{_ITEM})\s*)*,?\s*)?\]")
+_ITEMS = re.compile(_ITEM)
+_ESCAPES = {"\\": "\\", "'": "'", '"': '"', "n": "\n", "t": "\t", "r": "\r"}
+_ESCAPE = re.compile(r"\\(.)")
 
+csv.field_size_limit(sys.maxsize)
 
-def seed_recipes():
-    db: Session = SessionLocal()
-    file_string = os.path.join('backend','data', 'recipes.csv')
-    with open(file_string, encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            ingredients_raw = row["Cleaned_Ingredients"]
 
-            # Convert "['item1', 'item2']" → ['item1', 'item2']
-            ingredients_list = ast.literal_eval(ingredients_raw)
+# Parses "['item1', 'item2']" without ast for the common case (no exotic escapes)
+def parse_ingredients(raw: str) -> list[str]:
+    raw = raw.strip()
+    if _LIST.fullmatch(raw):
+        items = [match.group(0)[1:-1] for match in _ITEMS.finditer(raw)]
+        try:
+            return [_ESCAPE.sub(lambda m: _ESCAPES[m.group(1)], item) for item in items]
+        except KeyError:
+            pass  # \x, \u, ... escapes: let ast handle them
+    value = ast.literal_eval(raw)
+    return [str(item) for item in value]
 
-            recipe = models.Recipes(
-                title=row["Title"],
-                ingredients=ingredients_list,
-                steps=row["Instructions"],
-                image_url=f"/images/{row['Image_Name']}.jpg"
+
+# Postgres array literal: {"a","b \"c\""}
+def pg_array(items: list[str]) -> str:
+    escaped = (item.replace("\\", "\\\\").replace('"', '\\"') for item in items)
+    return "{" + ",".join(f'"{item}"' for item in escaped) + "}"
+
+
+def read_rows(csv_path: str):
+    with open(csv_path, encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            ingredients = parse_ingredients(row["Cleaned_Ingredients"])
+            yield (
+                row["Title"],
+                ingredients,
+                ingredient_terms(ingredients),
+                row["Instructions"] or "",
+                f"/images/{row['Image_Name']}.jpg",
             )
-            db.add(recipe)
-        db.commit()
-        db.close()
-        print("Database seeded with recipe data")
+
+
+def batches(rows, size: int):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def copy_buffer(batch) -> io.StringIO:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, quoting=csv.QUOTE_ALL)  # quoted "" is an empty string, not NULL
+    for title, ingredients, terms, steps, image_url in batch:
+        writer.writerow((title, pg_array(ingredients), pg_array(terms), steps, image_url))
+    buffer.seek(0)
+    return buffer
+
+
+def seed_recipes(csv_path: str = DEFAULT_CSV, batch_size: int = DEFAULT_BATCH_SIZE):
+    conn = engine.raw_connection()
+    started = time.perf_counter()
+    read = inserted = 0
+
+    try:
+        cur = conn.cursor()
+        # The pool hands this connection back with its temp tables, so a second
+        # run in the same process finds the (empty) table already there
+        cur.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS recipes_staging "
+            "(title text, ingredients varchar[], ingredient_terms varchar[], steps text, image_url text) "
+            "ON COMMIT DELETE ROWS"
+        )
+
+        for batch in batches(read_rows(csv_path), batch_size):
+            cur.copy_expert(
+                f"COPY recipes_staging ({', '.join(COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+                copy_buffer(batch),
+            )
+            # Seed rows are identified by (image_url, title), see ux_recipes_seed_source
+            cur.execute(
+                f"INSERT INTO recipes ({', '.join(COLUMNS)}) "
+                f"SELECT {', '.join(COLUMNS)} FROM recipes_staging "
+                "ON CONFLICT (image_url, title) WHERE created_by IS NULL DO NOTHING"
+            )
+            inserted += cur.rowcount
+            read += len(batch)
+            conn.commit()
+
+            elapsed = time.perf_counter() - started
+            print(f"{read} rows read, {inserted} inserted ({read / elapsed:,.0f} rows/sec)")
+    finally:
+        conn.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"Database seeded with recipe data: {inserted} new of {read} rows "
+          f"in {elapsed:.1f}s ({read / max(elapsed, 1e-9):,.0f} rows/sec)")
+
 
 if __name__ == "__main__":
-    seed_recipes()
+    parser = argparse.ArgumentParser(description="Bulk load recipes from the Kaggle CSV")
+    parser.add_argument("--csv", default=DEFAULT_CSV, help="path to the recipes CSV")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--thumbnails", action="store_true",
+                        help="also generate resized image variants (same as python -m backend.images)")
+    args = parser.parse_args()
+
+    seed_recipes(args.csv, args.batch_size)
+
+    if args.thumbnails:
+        from backend import images
+        try:
+            images.generate_all_variants()
+        finally:
+            images.shutdown()
@@ -0,0 +1,128 @@
+# backend/uploads.py
+# Recipe image uploads
+#
+# Uploads are streamed to a temp file in fixed-size chunks (file I/O runs in
+# the threadpool, never on the event loop), hashed on the way, and renamed
+# atomically to <sha256>.<ext>. Identical images are stored once, names never
+# collide, and memory per upload stays constant whatever the image size.
+#
+# Routers that take uploads use UploadRoute, which caps form bodies (multipart
+# or urlencoded) before they're parsed: a Content-Length over
+# MAX_REQUEST_BYTES gets a 413 straight away, a body without one is cut off
+# with a 413 once it gets there, and multipart text fields (title, steps,
+# ...) are limited to MAX_FORM_FIELD_BYTES each instead of Starlette's 1MB.
+
+import hashlib
+import os
+import tempfile
+from typing import Callable, Optional
+
+from fastapi import HTTPException, Request, UploadFile
+from fastapi.routing import APIRoute
+from starlette.concurrency import run_in_threadpool
+
+IMAGE_DIR = os.path.join('backend', 'data', 'Food_Images', 'Food_Images')
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_MB", "10")) * 1024 * 1024
+MAX_FORM_FIELD_BYTES = int(os.getenv("MAX_FORM_FIELD_KB", "256")) * 1024
+MAX_FORM_FIELDS = 200  # each ingredient is its own field
+MAX_FORM_FILES = 1
+# The image plus the text fields and multipart headers
+MAX_REQUEST_BYTES = MAX_UPLOAD_BYTES + 1024 * 1024
+ALLOWED_EXTENSIONS = {".jpg", ".png", ".webp", ".gif"}
+FORM_CONTENT_TYPES = ("multipart/form-data", "application/x-www-form-urlencoded")
+
+
+def too_large() -> HTTPException:
+    return HTTPException(status_code=413, detail="Request is too large")
+
+
+class UploadRequest(Request):
+    def form(self, *, max_files=MAX_FORM_FILES, max_fields=MAX_FORM_FIELDS,
+             max_part_size=MAX_FORM_FIELD_BYTES):
+        return super().form(max_files=max_files, max_fields=max_fields, max_part_size=max_part_size)
+
+
+class UploadRoute(APIRoute):
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def upload_handler(request: Request):
+            if not request.headers.get("content-type", "").startswith(FORM_CONTENT_TYPES):
+                return await handler(request)
+
+            length = request.headers.get("content-length")
+            if length and length.isdigit() and int(length) > MAX_REQUEST_BYTES:
+                raise too_large()
+
+            received = 0
+            receive = request.receive
+
+            async def limited_receive():
+                nonlocal received
+                message = await receive()
+                received += len(message.get("body", b""))
+                if received > MAX_REQUEST_BYTES:
+                    raise too_large()
+                return message
+
+            return await handler(UploadRequest(request.scope, limited_receive))
+
+        return upload_handler
+
+
+def image_extension(filename: Optional[str]) -> str:
+    ext = os.path.splitext(filename or "")[1].lower()
+    if ext == ".jpeg":
+        ext = ".jpg"
+    if ext not in ALLOWED_EXTENSIONS:
+        raise HTTPException(status_code=400, detail="Unsupported image type")
+    return ext
+
+
+def _write_chunk(out, chunk: bytes) -> None:
+    out.write(chunk)
+
+
+def _finish(out, tmp_path: str, final_path: str) -> None:
+    out.flush()
+    os.fsync(out.fileno())
+    out.close()
+    if os.path.exists(final_path):
+        os.remove(tmp_path)  # same content already stored
+    else:
+        os.replace(tmp_path, final_path)
+
+
+# Saves an uploaded image, returns its /images URL (None for an empty upload)
+async def save_image(file: UploadFile) -> Optional[str]:
+    ext = image_extension(file.filename)
+    os.makedirs(IMAGE_DIR, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=IMAGE_DIR, prefix=".upload-", suffix=ext)
+    out = os.fdopen(fd, "wb")
+    digest = hashlib.sha256()
+    size = 0
+
+    try:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if size > MAX_UPLOAD_BYTES:
+                raise HTTPException(status_code=413, detail="Image is too large")
+            digest.update(chunk)
+            await run_in_threadpool(_write_chunk, out, chunk)
+
+        if size == 0:
+            out.close()
+            os.remove(tmp_path)
+            return None
+
+        name = digest.hexdigest() + ext
+        await run_in_threadpool(_finish, out, tmp_path, os.path.join(IMAGE_DIR, name))
+    except BaseException:
+        out.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return "/images/" + name
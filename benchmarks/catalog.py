@@ -0,0 +1,250 @@
+# Synthetic catalog generator for benchmarks
+#
+# Fills a local, disposable Postgres with bench users, recipes and favorites
+# at any scale (10k to several million recipes):
+#
+#   python -m benchmarks.catalog --recipes 100000 --users 2000 --favorites-per-user 25 --seed 1
+#
+# Ingredient terms and the number of ingredients per recipe follow the
+# Kaggle CSV used by seed_db.py when it's present (term frequencies, list
+# lengths, step lengths, image names); otherwise a built-in Zipf-weighted
+# vocabulary. Favorites are skewed both ways: a few users favorite a lot and
+# a few recipes are favorited by many, like /recipes/popular expects.
+#
+# The same --seed and sizes always produce the same catalog. Every run first
+# deletes the previous bench users, which removes their recipes and favorites
+# (ON DELETE CASCADE); the seeded dataset recipes are left alone. Bench users
+# are bench<N>@example.com with the password BENCH_PASSWORD, which is what
+# benchmarks/scenarios.py logs in with.
+
+import argparse
+import csv
+import io
+import os
+import time
+from collections import Counter
+
+import numpy as np
+from sqlalchemy import text
+
+from backend.database import engine
+from backend.passwords import pwd_context
+from backend.popularity import RECONCILE_SQL
+from backend.seed_data.seed_db import DEFAULT_CSV, batches, pg_array, read_rows
+from benchmarks.scenarios import BENCH_EMAIL, BENCH_PASSWORD
+
+DEFAULT_BATCH_SIZE = 20000
+
+# Used without the CSV; roughly the head of the dataset's term distribution
+FALLBACK_TERMS = (
+    "garlic onion oil butter sugar egg flour lemon juice olive chicken milk cream "
+    "parsley cilantro vinegar honey thyme lime ginger tomato cheese shallot rice "
+    "potato carrot celery mustard cumin paprika basil wine soy sauce broth stock "
+    "scallion chile bacon beef pork yogurt vanilla cinnamon chocolate almond walnut "
+    "bean spinach mushroom zucchini pasta bread oregano rosemary sage coconut "
+    "orange apple pear berry fennel leek cabbage kale cucumber avocado salmon shrimp"
+).split()
+
+UNITS = ("cup", "cups", "tablespoon", "tablespoons", "teaspoon", "pound", "ounces", "clove", "can")
+QUANTITIES = ("1", "2", "3", "1/2", "1/4", "3/4", "1 1/2", "4", "6")
+ADJECTIVES = ("Roasted", "Spicy", "Crispy", "Braised", "Grilled", "Creamy", "Quick", "Smoky", "Herbed", "Glazed")
+DISHES = ("Salad", "Soup", "Stew", "Tart", "Pasta", "Bowl", "Skillet", "Curry", "Casserole", "Tacos")
+STEP_WORDS = (
+    "heat stir add season cook until golden tender simmer whisk combine transfer "
+    "bake minutes oven pan skillet medium low high bowl mixture serve garnish "
+    "reserve drain toss sprinkle cover remove cool slice pour over evenly"
+).split()
+
+
+# What recipes look like: term frequencies, ingredients per recipe, step
+# lengths and image names, from the CSV if available
+class Distribution:
+    def __init__(self, csv_path: str = DEFAULT_CSV):
+        term_counts = Counter()
+        lengths, step_lengths, images = [], [], []
+        if csv_path and os.path.exists(csv_path):
+            for _title, ingredients, terms, steps, image_url in read_rows(csv_path):
+                term_counts.update(terms)
+                lengths.append(len(ingredients))
+                step_lengths.append(len(steps))
+                images.append(image_url)
+
+        if term_counts:
+            self.source = csv_path
+            self.terms = [term for term, _ in term_counts.most_common()]
+            counts = np.array([term_counts[t] for t in self.terms], dtype=np.float64)
+        else:
+            self.source = "built-in"
+            self.terms = list(FALLBACK_TERMS)
+            counts = 1.0 / np.arange(1, len(self.terms) + 1)  # Zipf
+        self.term_weights = counts / counts.sum()
+        self.lengths = np.array(lengths or [9], dtype=np.int64)
+        self.step_lengths = np.array(step_lengths or [900], dtype=np.int64)
+        self.images = images
+
+    def describe(self) -> str:
+        return (f"{self.source}: {len(self.terms)} terms, "
+                f"{self.lengths.mean():.1f} ingredients/recipe, {self.step_lengths.mean():.0f} chars of steps")
+
+
+def step_sentences(rng: np.random.Generator, count: int = 200) -> list[str]:
+    sentences = []
+    for _ in range(count):
+        words = rng.choice(STEP_WORDS, size=int(rng.integers(6, 18)))
+        sentences.append(" ".join(words).capitalize() + ".")
+    return sentences
+
+
+# Yields (title, ingredients, terms, steps, image_url, created_by) rows
+def generate_recipes(rng: np.random.Generator, dist: Distribution, count: int, user_ids: np.ndarray,
+                     chunk: int = DEFAULT_BATCH_SIZE):
+    sentences = step_sentences(rng)
+    mean_sentence = sum(len(s) for s in sentences) / len(sentences)
+    terms = np.array(dist.terms, dtype=object)
+
+    for start in range(0, count, chunk):
+        n = min(chunk, count - start)
+        lengths = np.maximum(rng.choice(dist.lengths, size=n), 1)
+        offsets = np.concatenate(([0], np.cumsum(lengths)))
+        drawn = terms[rng.choice(len(terms), size=int(offsets[-1]), p=dist.term_weights)]
+        step_counts = np.maximum(rng.choice(dist.step_lengths, size=n) / mean_sentence, 1).astype(np.int64)
+        creators = rng.choice(user_ids, size=n)
+        quantities = rng.integers(0, len(QUANTITIES), size=int(offsets[-1]))
+        units = rng.integers(0, len(UNITS), size=int(offsets[-1]))
+        adjectives = rng.integers(0, len(ADJECTIVES), size=n)
+        dishes = rng.integers(0, len(DISHES), size=n)
+        images = rng.integers(0, len(dist.images), size=n) if dist.images else None
+
+        for i in range(n):
+            lo, hi = offsets[i], offsets[i + 1]
+            chosen = list(dict.fromkeys(drawn[lo:hi]))  # draws repeat for common terms
+            ingredients = [f"{QUANTITIES[quantities[j]]} {UNITS[units[j]]} {drawn[j]}" for j in range(lo, hi)]
+            picked = rng.integers(0, len(sentences), size=step_counts[i])
+            yield (
+                f"{ADJECTIVES[adjectives[i]]} {chosen[0].title()} {DISHES[dishes[i]]} #{start + i + 1}",
+                ingredients,
+                sorted(chosen),
+                " ".join(sentences[s] for s in picked),
+                dist.images[images[i]] if images is not None else None,
+                int(creators[i]),
+            )
+
+
+# (user_id, recipe_id) pairs, unique, skewed towards active users and popular recipes
+def generate_favorites(rng: np.random.Generator, user_ids: np.ndarray, recipe_ids: np.ndarray,
+                       per_user: float) -> np.ndarray:
+    total = int(len(user_ids) * per_user)
+    if not total or not len(recipe_ids):
+        return np.zeros((0, 2), dtype=np.int64)
+
+    def zipf_weights(n: int, exponent: float) -> np.ndarray:
+        weights = 1.0 / np.arange(1, n + 1) ** exponent
+        return weights / weights.sum()
+
+    users = rng.choice(user_ids, size=total, p=zipf_weights(len(user_ids), 0.6))
+    # Popularity rank is a random permutation, so popular recipes aren't just the oldest ids
+    ranked = rng.permutation(recipe_ids)
+    recipes = ranked[rng.choice(len(ranked), size=total, p=zipf_weights(len(ranked), 0.8))]
+    pairs = np.unique(np.stack([users, recipes], axis=1), axis=0)
+    return pairs
+
+
+# Every field is quoted (an empty string stays ""), except the force_null columns where "" is NULL
+def copy_rows(cur, table: str, columns: tuple, rows, force_null: tuple = ()) -> None:
+    buffer = io.StringIO()
+    csv.writer(buffer, quoting=csv.QUOTE_ALL).writerows(rows)
+    buffer.seek(0)
+    options = f", FORCE_NULL ({', '.join(force_null)})" if force_null else ""
+    cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv{options})", buffer)
+
+
+def recipe_copy_rows(batch):
+    for title, ingredients, terms, steps, image_url, created_by in batch:
+        yield title, pg_array(ingredients), pg_array(terms), steps, image_url, created_by
+
+
+def bench_ids(cur, query: str) -> np.ndarray:
+    cur.execute(query, (BENCH_EMAIL.format("%"),))
+    return np.array([row[0] for row in cur.fetchall()], dtype=np.int64)
+
+
+def build_catalog(recipes: int, users: int, favorites_per_user: float, seed: int = 0,
+                  csv_path: str = DEFAULT_CSV, batch_size: int = DEFAULT_BATCH_SIZE) -> dict:
+    started = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    dist = Distribution(csv_path)
+    print(f"Ingredient distribution from {dist.describe()}")
+
+    conn = engine.raw_connection()
+    try:
+        cur = conn.cursor()
+        cur.execute("DELETE FROM users WHERE email LIKE %s", (BENCH_EMAIL.format("%"),))
+        conn.commit()
+
+        # One bcrypt hash shared by every bench user; hashing millions would take hours
+        password_hash = pwd_context.hash(BENCH_PASSWORD)
+        for batch in batches(range(1, users + 1), batch_size):
+            copy_rows(cur, "users", ("name", "email", "password_hash"),
+                      ((f"Bench User {n}", BENCH_EMAIL.format(n), password_hash) for n in batch))
+        conn.commit()
+        user_ids = bench_ids(cur, "SELECT id FROM users WHERE email LIKE %s ORDER BY id")
+        print(f"{len(user_ids)} users in {time.perf_counter() - started:.1f}s")
+
+        written = 0
+        for batch in batches(generate_recipes(rng, dist, recipes, user_ids, batch_size), batch_size):
+            copy_rows(cur, "recipes",
+                      ("title", "ingredients", "ingredient_terms", "steps", "image_url", "created_by"),
+                      recipe_copy_rows(batch), force_null=("image_url",))
+            conn.commit()
+            written += len(batch)
+            elapsed = time.perf_counter() - started
+            print(f"{written} recipes ({written / elapsed:,.0f} rows/sec)")
+
+        recipe_ids = bench_ids(cur, "SELECT r.id FROM recipes r JOIN users u ON u.id = r.created_by "
+                                    "WHERE u.email LIKE %s ORDER BY r.id")
+        pairs = generate_favorites(rng, user_ids, recipe_ids, favorites_per_user)
+        for batch in batches(pairs.tolist(), batch_size):
+            copy_rows(cur, "favorites", ("user_id", "recipe_id"), batch)
+        conn.commit()
+        print(f"{len(pairs)} favorites in {time.perf_counter() - started:.1f}s")
+    finally:
+        conn.close()
+
+    with engine.begin() as db:
+        db.execute(RECONCILE_SQL)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as db:
+        db.execute(text("ANALYZE users, recipes, favorites"))
+
+    elapsed = time.perf_counter() - started
+    print(f"Catalog built in {elapsed:.1f}s")
+    return {
+        "seed": seed,
+        "users": len(user_ids),
+        "recipes": len(recipe_ids),
+        "favorites": len(pairs),
+        "distribution": dist.source,
+        "build_s": elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic recipe catalog for benchmarks")
+    parser.add_argument("--recipes", type=int, default=10000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--favorites-per-user", type=float, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--csv", default=DEFAULT_CSV, help="dataset to model ingredients on")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--similar", action="store_true",
+                        help="also rebuild recipe similarities (python -m backend.recommendations)")
+    args = parser.parse_args()
+
+    build_catalog(args.recipes, args.users, args.favorites_per_user, args.seed, args.csv, args.batch_size)
+
+    if args.similar:
+        from backend import recommendations
+        recommendations.rebuild_all()
+
+
+if __name__ == "__main__":
+    main()
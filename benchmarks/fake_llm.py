@@ -0,0 +1,116 @@
+# Fake chat-completions server for benchmarking the AI routes
+#
+# Answers /v1/chat/completions like the Hugging Face router (plain JSON, or
+# SSE chunks with stream=true) with one recipe built from the ingredients in
+# the prompt, after a fixed time-to-first-token and at a fixed token rate,
+# so /recipes/suggest-recipes can be load tested without quota or network.
+#
+#   python -m benchmarks.fake_llm --port 8009 --first-token 0.5 --tokens-per-second 60
+#   HF_BASE_URL=http://127.0.0.1:8009 uvicorn backend.main:app --port 8008
+
+import argparse
+import asyncio
+import json
+import re
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+app = FastAPI()
+app.state.first_token = 0.5
+app.state.tokens_per_second = 60.0
+
+_INGREDIENTS = re.compile(r"these ingredients:\s*(.+?)\.\s*$", re.MULTILINE)
+
+
+def recipe_json(prompt: str) -> str:
+    match = _INGREDIENTS.search(prompt)
+    ingredients = [i.strip() for i in match.group(1).split(",")] if match else ["water"]
+    recipe = {
+        "title": f"{ingredients[0].title()} Skillet",
+        "ingredients": [f"1 cup {i}" for i in ingredients],
+        "steps": " ".join(f"Add the {i} and stir for 2 minutes." for i in ingredients) + " Serve warm.",
+        "image_url": None,
+    }
+    return json.dumps([recipe], indent=2)
+
+
+# ~4 characters per token, like real model output
+def tokens(content: str) -> list[str]:
+    return [content[i:i + 4] for i in range(0, len(content), 4)]
+
+
+def completion(model: str, content: str) -> dict:
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "system_fingerprint": "fake-llm",
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+            "logprobs": None,
+        }],
+        "usage": {"prompt_tokens": 0, "completion_tokens": len(tokens(content)), "total_tokens": len(tokens(content))},
+    }
+
+
+def chunk(completion_id: str, model: str, delta: dict, finish_reason=None) -> str:
+    body = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "system_fingerprint": "fake-llm",
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason, "logprobs": None}],
+    }
+    return f"data: {json.dumps(body)}\n\n"
+
+
+async def stream_events(model: str, content: str):
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    delay = 1 / app.state.tokens_per_second
+    yield chunk(completion_id, model, {"role": "assistant", "content": ""})
+    for token in tokens(content):
+        await asyncio.sleep(delay)
+        yield chunk(completion_id, model, {"content": token})
+    yield chunk(completion_id, model, {}, "stop")
+    yield "data: [DONE]\n\n"
+
+
+@app.post("/v1/chat/completions")
+@app.post("/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    model = body.get("model") or "fake-llm"
+    prompt = "\n".join(m.get("content") or "" for m in body.get("messages", []))
+    content = recipe_json(prompt)
+
+    await asyncio.sleep(app.state.first_token)
+    if body.get("stream"):
+        return StreamingResponse(stream_events(model, content), media_type="text/event-stream")
+
+    await asyncio.sleep(len(tokens(content)) / app.state.tokens_per_second)
+    return JSONResponse(completion(model, content))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake chat-completions server for benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8009)
+    parser.add_argument("--first-token", type=float, default=0.5, help="seconds before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=60.0)
+    args = parser.parse_args()
+
+    app.state.first_token = args.first_token
+    app.state.tokens_per_second = args.tokens_per_second
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+# Closed-loop HTTP load generator for the MyRecipeBox API
+#
+# Each of --concurrency workers sends requests back to back for --duration
+# seconds, cycling through the --path list, and the run is summarized as
+# throughput and latency percentiles per path.
+#
+# Comparing two builds at the same worker count, e.g. sync vs async routes:
+#
+#   uvicorn backend.main:app --workers 1 --port 8008      (build A, then build B)
+#   python -m benchmarks.load_test --email me@example.com --password '...' \
+#       --path "/recipes/?page=1" --path "/recipes/?page=500" \
+#       --path "/recipes/search?q=chicken" --path "/recipes/id/42" --path "/favorites/" \
+#       --concurrency 64 --duration 30 --out results/a.json
+#   python -m benchmarks.load_test --compare results/a.json results/b.json
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import time
+from collections import defaultdict
+
+import httpx
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = max(math.ceil(pct / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[index]
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "mean_ms": 1000 * sum(latencies) / len(latencies) if latencies else 0.0,
+        "p50_ms": 1000 * percentile(latencies, 50),
+        "p95_ms": 1000 * percentile(latencies, 95),
+        "p99_ms": 1000 * percentile(latencies, 99),
+    }
+
+
+async def login(client: httpx.AsyncClient, email: str, password: str) -> str:
+    res = await client.post("/users/login", data={"username": email, "password": password})
+    res.raise_for_status()
+    return res.json()["access_token"]
+
+
+async def run_load(base_url: str, paths: list[str], concurrency: int, duration: float,
+                   token: str = None) -> dict:
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=60) as client:
+        deadline = time.perf_counter() + duration
+
+        async def worker(offset: int):
+            i = offset
+            while time.perf_counter() < deadline:
+                path = paths[i % len(paths)]
+                i += 1
+                started = time.perf_counter()
+                try:
+                    res = await client.get(path)
+                    ok = res.status_code < 400
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    latencies[path].append(time.perf_counter() - started)
+                else:
+                    errors[path] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        "base_url": base_url,
+        "concurrency": concurrency,
+        "duration_s": elapsed,
+        "total": summarize(all_latencies, sum(errors.values()), elapsed),
+        "paths": {path: summarize(latencies[path], errors[path], elapsed) for path in paths},
+    }
+
+
+def print_report(result: dict) -> None:
+    print(f"{result['base_url']}  concurrency={result['concurrency']}  {result['duration_s']:.1f}s")
+    rows = [("TOTAL", result["total"])] + list(result["paths"].items())
+    for name, stats in rows:
+        print(f"  {name:45.45} {stats['rps']:9.1f} req/s  p50 {stats['p50_ms']:7.1f}ms  "
+              f"p95 {stats['p95_ms']:7.1f}ms  p99 {stats['p99_ms']:7.1f}ms  errors {stats['errors']}")
+
+
+def print_comparison(before: dict, after: dict) -> None:
+    print("                                               req/s before -> after      p99 before -> after")
+    names = ["TOTAL"] + [path for path in after["paths"] if path in before["paths"]]
+    for name in names:
+        a = before["total"] if name == "TOTAL" else before["paths"][name]
+        b = after["total"] if name == "TOTAL" else after["paths"][name]
+        gain = b["rps"] / a["rps"] if a["rps"] else float("inf")
+        print(f"  {name:45.45} {a['rps']:8.1f} -> {b['rps']:8.1f} (x{gain:.2f})  "
+              f"{a['p99_ms']:7.1f} -> {b['p99_ms']:7.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the MyRecipeBox API")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8008")
+    parser.add_argument("--email", default=os.getenv("BENCH_EMAIL"))
+    parser.add_argument("--password", default=os.getenv("BENCH_PASSWORD"))
+    parser.add_argument("--path", action="append", default=[], help="GET path to hit, repeatable")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--out", help="write the result as JSON to this file")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"),
+                        help="compare two result files instead of running")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f_before, open(args.compare[1]) as f_after:
+            print_comparison(json.load(f_before), json.load(f_after))
+        return
+
+    async def run():
+        token = None
+        if args.email:
+            async with httpx.AsyncClient(base_url=args.base_url) as client:
+                token = await login(client, args.email, args.password)
+        return await run_load(args.base_url, args.path or ["/recipes/"], args.concurrency,
+                              args.duration, token)
+
+    result = asyncio.run(run())
+    print_report(result)
+    if args.out:
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
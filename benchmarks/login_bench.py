@@ -0,0 +1,89 @@
+# Login throughput benchmark
+#
+# Measures /users/login requests/sec, and the latency of concurrent /recipes
+# reads before and during a login burst, i.e. how much password hashing
+# slows down the rest of the API.
+#
+#   python -m benchmarks.login_bench --email me@example.com --password '...' \
+#       --logins 32 --readers 16 --duration 20 --out results/login.json
+
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import httpx
+
+from benchmarks.load_test import login, run_load, summarize
+
+
+async def login_burst(base_url: str, email: str, password: str, concurrency: int, duration: float) -> dict:
+    latencies, errors = [], 0
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                res = await client.post("/users/login", data={"username": email, "password": password})
+                if res.status_code == 200:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return summarize(latencies, errors, time.perf_counter() - started)
+
+
+async def run(args) -> dict:
+    async with httpx.AsyncClient(base_url=args.base_url) as client:
+        token = await login(client, args.email, args.password)
+
+    reads = [args.read_path]
+    idle = await run_load(args.base_url, reads, args.readers, args.duration, token)
+
+    logins, loaded = await asyncio.gather(
+        login_burst(args.base_url, args.email, args.password, args.logins, args.duration),
+        run_load(args.base_url, reads, args.readers, args.duration, token),
+    )
+    return {
+        "logins": logins,
+        "reads_idle": idle["total"],
+        "reads_during_logins": loaded["total"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark login throughput and its impact on reads")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8008")
+    parser.add_argument("--email", default=os.getenv("BENCH_EMAIL"), required=not os.getenv("BENCH_EMAIL"))
+    parser.add_argument("--password", default=os.getenv("BENCH_PASSWORD"))
+    parser.add_argument("--logins", type=int, default=32, help="concurrent login clients")
+    parser.add_argument("--readers", type=int, default=16, help="concurrent /recipes readers")
+    parser.add_argument("--read-path", default="/recipes/?page=1")
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--out")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+
+    logins = result["logins"]
+    print(f"logins: {logins['rps']:.1f} req/s  p50 {logins['p50_ms']:.0f}ms  "
+          f"p99 {logins['p99_ms']:.0f}ms  errors {logins['errors']}")
+    for name in ("reads_idle", "reads_during_logins"):
+        stats = result[name]
+        print(f"{name}: {stats['rps']:.1f} req/s  p50 {stats['p50_ms']:.1f}ms  p99 {stats['p99_ms']:.1f}ms")
+
+    if args.out:
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
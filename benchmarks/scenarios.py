@@ -0,0 +1,271 @@
+# Scripted load test of the whole API against a generated catalog
+#
+# Each of --concurrency workers logs in as its own bench user (see
+# benchmarks/catalog.py) and runs scenarios back to back, picked at random
+# with the --mix weights:
+#
+#   browse       first listing pages, a recipe, its similar recipes, /recipes/popular
+#   deep_paging  a chain of cursor pages, then one deep offset page
+#   search       a search for dataset ingredient terms, then its second page
+#   favorites    toggle a favorite on a random recipe, then list favorites
+#   login        a fresh /users/login (bcrypt)
+#   suggest      /recipes/suggest-recipes, plain or streamed; run the API
+#                with HF_BASE_URL pointing at benchmarks/fake_llm.py
+#
+# Requests are reported per endpoint (route template) as req/s and
+# p50/p95/p99, in the same JSON as load_test.py plus the commit and run
+# parameters, so two commits compare with `load_test --compare`:
+#
+#   python -m benchmarks.catalog --recipes 100000 --users 500 --seed 1
+#   uvicorn backend.main:app --workers 1 --port 8008
+#   python -m benchmarks.scenarios --mix browse=4,search=2,deep_paging=1,favorites=2,login=1 \
+#       --concurrency 64 --duration 60 --seed 1 --out results/$(git rev-parse --short HEAD).json
+#   python -m benchmarks.load_test --compare results/<before>.json results/<after>.json
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+
+import httpx
+
+from backend.ingredients import ingredient_terms
+from benchmarks.load_test import login, print_report, summarize
+
+# Accounts created by benchmarks/catalog.py
+BENCH_EMAIL = "bench{}@example.com"
+BENCH_PASSWORD = os.getenv("BENCH_PASSWORD", "bench-password")
+
+DEFAULT_MIX = "browse=4,search=2,deep_paging=1,favorites=2,login=1"
+SAMPLE_PAGES = 8
+PAGE_SIZE = 20
+
+
+# Latencies per endpoint; requests started during the warmup aren't counted
+class Recorder:
+    def __init__(self, warmup_until: float):
+        self.warmup_until = warmup_until
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.scenarios = Counter()
+
+    async def request(self, client: httpx.AsyncClient, label: str, method: str, url: str,
+                      ok: tuple = (200,), **kwargs):
+        started = time.perf_counter()
+        try:
+            res = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            res = None
+        if started >= self.warmup_until:
+            if res is not None and res.status_code in ok:
+                self.latencies[label].append(time.perf_counter() - started)
+            else:
+                self.errors[label] += 1
+        return res if res is not None and res.status_code in ok else None
+
+
+# What the workers know about the catalog, sampled once before the run
+class Catalog:
+    def __init__(self):
+        self.total = 0
+        self.total_pages = 1
+        self.recipe_ids = []
+        self.terms = []
+        self.term_weights = []
+
+    # Listings need a logged-in user: `token` is any bench user's
+    async def sample(self, client: httpx.AsyncClient, rng: random.Random, token: str) -> None:
+        headers = {"Authorization": f"Bearer {token}"}
+
+        async def page(number: int) -> dict:
+            res = await client.get("/recipes/", headers=headers,
+                                   params={"page": number, "page_size": PAGE_SIZE, "fields": "full"})
+            res.raise_for_status()
+            return res.json()
+
+        first = await page(1)
+        self.total = first["total"] or 0
+        self.total_pages = max(first["total_pages"] or 1, 1)
+
+        pages = [first] + [await page(rng.randint(1, self.total_pages)) for _ in range(SAMPLE_PAGES)]
+        counts = Counter()
+        for page in pages:
+            for recipe in page["recipes"]:
+                self.recipe_ids.append(recipe["id"])
+                counts.update(ingredient_terms(recipe["ingredients"]))
+        if not self.recipe_ids:
+            raise SystemExit("The catalog is empty, run python -m benchmarks.catalog first")
+
+        self.terms, self.term_weights = zip(*counts.most_common(200))
+
+    def term(self, rng: random.Random) -> str:
+        return rng.choices(self.terms, self.term_weights)[0]
+
+
+class Worker:
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, catalog: Catalog,
+                 rng: random.Random, email: str, token: str):
+        self.client = client
+        self.recorder = recorder
+        self.catalog = catalog
+        self.rng = rng
+        self.email = email
+        self.headers = {"Authorization": f"Bearer {token}"}
+
+    async def request(self, label: str, method: str, url: str, **kwargs):
+        return await self.recorder.request(self.client, label, method, url, headers=self.headers, **kwargs)
+
+    async def browse(self) -> None:
+        page = await self.request("GET /recipes/", "GET", "/recipes/", params={
+            "page": self.rng.choice((1, 1, 1, 2, 3)), "page_size": PAGE_SIZE,
+        })
+        recipes = page.json()["recipes"] if page is not None else []
+        recipe_id = self.rng.choice(recipes)["id"] if recipes else self.rng.choice(self.catalog.recipe_ids)
+        await self.request("GET /recipes/id/{id}", "GET", f"/recipes/id/{recipe_id}")
+        await self.request("GET /recipes/id/{id}/similar", "GET", f"/recipes/id/{recipe_id}/similar")
+        await self.request("GET /recipes/popular", "GET", "/recipes/popular", params={"page_size": PAGE_SIZE})
+
+    async def deep_paging(self, pages: int = 10) -> None:
+        after = None
+        for _ in range(pages):
+            params = {"page_size": PAGE_SIZE, **({"after": after} if after else {})}
+            res = await self.request("GET /recipes/?after", "GET", "/recipes/", params=params)
+            after = res.json()["next_cursor"] if res is not None else None
+            if not after:
+                break
+        page = self.rng.randint(self.catalog.total_pages // 2, self.catalog.total_pages)
+        await self.request("GET /recipes/?page=deep", "GET", "/recipes/",
+                           params={"page": max(page, 1), "page_size": PAGE_SIZE})
+
+    async def search(self) -> None:
+        q = " ".join(dict.fromkeys(self.catalog.term(self.rng) for _ in range(self.rng.randint(1, 2))))
+        res = await self.request("GET /recipes/search", "GET", "/recipes/search",
+                                 params={"q": q, "page_size": PAGE_SIZE})
+        after = res.json()["next_cursor"] if res is not None else None
+        if after:
+            await self.request("GET /recipes/search?after", "GET", "/recipes/search",
+                               params={"q": q, "page_size": PAGE_SIZE, "after": after})
+
+    async def favorites(self) -> None:
+        recipe_id = self.rng.choice(self.catalog.recipe_ids)
+        added = await self.request("POST /favorites/{id}", "POST", f"/favorites/{recipe_id}", ok=(200, 400))
+        if added is not None and added.status_code == 400:  # already a favorite
+            await self.request("DELETE /favorites/{id}", "DELETE", f"/favorites/{recipe_id}")
+        await self.request("GET /favorites/", "GET", "/favorites/", params={"page_size": PAGE_SIZE})
+
+    async def login(self) -> None:
+        await self.recorder.request(self.client, "POST /users/login", "POST", "/users/login",
+                                    data={"username": self.email, "password": BENCH_PASSWORD})
+
+    async def suggest(self) -> None:
+        ingredients = list(dict.fromkeys(self.catalog.term(self.rng) for _ in range(self.rng.randint(2, 5))))
+        if self.rng.random() < 0.5:
+            await self.request("POST /recipes/suggest-recipes", "POST", "/recipes/suggest-recipes",
+                               json={"ingredients": ingredients})
+        else:
+            await self.request("POST /recipes/suggest-recipes/stream", "POST", "/recipes/suggest-recipes/stream",
+                               json={"ingredients": ingredients})
+
+
+SCENARIOS = ("browse", "deep_paging", "search", "favorites", "login", "suggest")
+
+
+def parse_mix(mix: str) -> dict:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario {name!r}, expected one of {', '.join(SCENARIOS)}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def git_commit() -> dict:
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    return {"commit": git("rev-parse", "HEAD"), "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+
+async def run_scenarios(base_url: str, mix: dict, concurrency: int, duration: float, warmup: float,
+                        users: int, seed: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        emails = [BENCH_EMAIL.format(n % users + 1) for n in range(concurrency)]
+        tokens = await asyncio.gather(*(login(client, email, BENCH_PASSWORD) for email in emails))
+
+        catalog = Catalog()
+        await catalog.sample(client, random.Random(seed), tokens[0])
+
+        started = time.perf_counter()
+        recorder = Recorder(started + warmup)
+        deadline = started + warmup + duration
+        names, weights = zip(*mix.items())
+
+        async def worker(n: int):
+            rng = random.Random(seed * 1000 + n)
+            w = Worker(client, recorder, catalog, rng, emails[n], tokens[n])
+            while time.perf_counter() < deadline:
+                name = rng.choices(names, weights)[0]
+                await getattr(w, name)()
+                if time.perf_counter() >= recorder.warmup_until:
+                    recorder.scenarios[name] += 1
+
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+        elapsed = time.perf_counter() - recorder.warmup_until
+
+    labels = sorted(set(recorder.latencies) | set(recorder.errors))
+    all_latencies = [value for values in recorder.latencies.values() for value in values]
+    return {
+        "base_url": base_url,
+        "concurrency": concurrency,
+        "duration_s": elapsed,
+        "total": summarize(all_latencies, sum(recorder.errors.values()), elapsed),
+        "paths": {label: summarize(recorder.latencies[label], recorder.errors[label], elapsed) for label in labels},
+        "scenarios": dict(recorder.scenarios),
+        "meta": {
+            **git_commit(),
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "host": platform.node(),
+            "mix": mix,
+            "warmup_s": warmup,
+            "seed": seed,
+            "bench_users": users,
+            "catalog_recipes": catalog.total,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run scripted scenarios against the MyRecipeBox API")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8008")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"scenario=weight list (default {DEFAULT_MIX})")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=5, help="seconds run before measuring")
+    parser.add_argument("--users", type=int, default=100, help="bench users to log in as (bench1..N)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write the result as JSON to this file")
+    args = parser.parse_args()
+
+    result = asyncio.run(run_scenarios(args.base_url, parse_mix(args.mix), args.concurrency, args.duration,
+                                       args.warmup, args.users, args.seed))
+    print_report(result)
+    print("  scenarios: " + ", ".join(f"{name}={count}" for name, count in sorted(result["scenarios"].items())))
+    if args.out:
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
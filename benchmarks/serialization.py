@@ -0,0 +1,129 @@
+# Listing serialization benchmark (no server or database needed)
+#
+# Builds pages of recipe rows shaped like the Kaggle dataset (long steps text,
+# ~10 ingredient lines) and compares, per page:
+#   - old path: model_validate(r).model_dump() per row, then FastAPI's
+#     jsonable_encoder + json.dumps
+#   - new path: one TypeAdapter validation for the page + pydantic-core to_json
+# and the response size raw, gzipped and (if installed) brotli-compressed,
+# for full pages and for the default ?fields=summary projection.
+#
+#   python -m benchmarks.serialization --page-size 10 --page-size 50 --rounds 500
+
+import argparse
+import gzip
+import json
+import random
+import string
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from fastapi.encoders import jsonable_encoder
+
+from backend import schemas
+from backend.compression import BROTLI_QUALITY, GZIP_LEVEL
+from backend.pagination import page_response
+from backend.responses import FastJSONResponse, recipe_items
+
+
+def words(rng: random.Random, count: int) -> str:
+    return " ".join("".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 9))) for _ in range(count))
+
+
+# Stand-ins for ORM rows; from_attributes validation reads them the same way
+def fake_rows(count: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    return [
+        SimpleNamespace(
+            id=i,
+            title=words(rng, 4).title(),
+            ingredients=[f"{rng.randint(1, 4)} cups {words(rng, 3)}" for _ in range(10)],
+            steps=". ".join(words(rng, 14) for _ in range(12)),
+            image_url=f"/images/{words(rng, 3).replace(' ', '-')}.jpg",
+            created_by=None,
+            creator=None,
+            updated_at=datetime.now(timezone.utc),
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def old_path(rows: list, favorite_ids: set) -> bytes:
+    items = []
+    for r in rows:
+        item = schemas.RecipeResponse.model_validate(r).model_dump()
+        item["is_favorite"] = r.id in favorite_ids
+        items.append(item)
+    body = jsonable_encoder(page_response(items, 1, len(rows), 10000, None))
+    return json.dumps(body, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def new_path(rows: list, favorite_ids: set, fields: str = "full") -> bytes:
+    items = recipe_items(rows, favorite_ids, fields=fields)
+    return FastJSONResponse(page_response(items, 1, len(rows), 10000, None)).body
+
+
+def time_per_call(fn, rounds: int, *args) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fn(*args)
+    return (time.perf_counter() - started) / rounds
+
+
+def brotli_size(body: bytes):
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return len(brotli.compress(body, quality=BROTLI_QUALITY))
+
+
+def bench_page(page_size: int, rounds: int) -> dict:
+    rows = fake_rows(page_size)
+    favorite_ids = {r.id for r in rows[::3]}
+    body = new_path(rows, favorite_ids)
+    summary = new_path(rows, favorite_ids, "summary")
+
+    return {
+        "page_size": page_size,
+        "old_ms": 1000 * time_per_call(old_path, rounds, rows, favorite_ids),
+        "new_ms": 1000 * time_per_call(new_path, rounds, rows, favorite_ids),
+        "bytes_raw": len(body),
+        "bytes_gzip": len(gzip.compress(body, compresslevel=GZIP_LEVEL)),
+        "bytes_brotli": brotli_size(body),
+        "summary_ms": 1000 * time_per_call(new_path, rounds, rows, favorite_ids, "summary"),
+        "summary_bytes_raw": len(summary),
+        "summary_bytes_gzip": len(gzip.compress(summary, compresslevel=GZIP_LEVEL)),
+    }
+
+
+def print_result(result: dict) -> None:
+    brotli = result["bytes_brotli"]
+    print(f"page_size={result['page_size']:<4} "
+          f"serialize old {result['old_ms']:.3f} ms  new {result['new_ms']:.3f} ms  "
+          f"({result['old_ms'] / result['new_ms']:.1f}x)   "
+          f"bytes raw {result['bytes_raw']:,}  gzip {result['bytes_gzip']:,}  "
+          f"brotli {f'{brotli:,}' if brotli is not None else 'n/a'}")
+    print(f"{'':14}summary {result['summary_ms']:.3f} ms   "
+          f"bytes raw {result['summary_bytes_raw']:,}  gzip {result['summary_bytes_gzip']:,}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark listing serialization and compression")
+    parser.add_argument("--page-size", type=int, action="append", default=[], help="repeatable")
+    parser.add_argument("--rounds", type=int, default=300)
+    parser.add_argument("--out", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = [bench_page(size, args.rounds) for size in (args.page_size or [10, 50])]
+    for result in results:
+        print_result(result)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
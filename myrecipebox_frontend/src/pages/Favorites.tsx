@@ -84,7 +84,8 @@ export default function Favorites() {
             </div>
 
             <img
-              src={`http://127.0.0.1:8008${recipe.image_url}`}
+              src={`http://127.0.0.1:8008${recipe.image_variants?.["320"] ?? recipe.image_url}`}
+              loading="lazy"
               alt={recipe.title}
               style={styles.cardImg}
             />
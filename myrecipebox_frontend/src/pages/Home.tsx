@@ -134,7 +134,8 @@ export default function Home() {
             </div>
 
             <img
-              src={`http://127.0.0.1:8008${recipe.image_url}`}
+              src={`http://127.0.0.1:8008${recipe.image_variants?.["320"] ?? recipe.image_url}`}
+              loading="lazy"
               alt={recipe.title}
               style={styles.cardImg}
             />
@@ -0,0 +1,117 @@
+# Shared test setup
+#
+# Database tests run the real app against a disposable Postgres database
+# named by TEST_POSTGRES_DB, on the server configured in .env (POSTGRES_USER,
+# POSTGRES_PASSWORD, POSTGRES_HOST, POSTGRES_PORT). Its tables are dropped and
+# recreated. Without TEST_POSTGRES_DB those tests are skipped.
+#
+#   TEST_POSTGRES_DB=recipebox_test python -m pytest -q
+
+import os
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+
+TEST_POSTGRES_DB = os.getenv("TEST_POSTGRES_DB")
+if TEST_POSTGRES_DB:
+    # Set before backend.database reads them; load_dotenv() doesn't override
+    os.environ["POSTGRES_DB"] = TEST_POSTGRES_DB
+    os.environ.setdefault("SECRET_KEY", "test-secret-key")
+    os.environ["FAVORITE_RECONCILE_INTERVAL"] = "0"
+    os.environ["AUTH_TRUST_TOKEN_CLAIMS"] = "false"
+
+PASSWORD = "Test-passw0rd!"
+RECIPES = 60
+FAVORITES = 55
+
+
+@pytest.fixture(scope="session")
+def app():
+    if not TEST_POSTGRES_DB:
+        pytest.skip("set TEST_POSTGRES_DB to run the database tests")
+    os.makedirs(os.path.join("backend", "data", "Food_Images", "Food_Images"), exist_ok=True)  # mounted at /images
+
+    from backend import models
+    from backend.database import engine
+    models.Base.metadata.drop_all(engine)
+
+    from backend.main import app  # creates the tables
+    return app
+
+
+# One client (and event loop) for the whole session: the async engine's
+# pooled connections belong to the loop that opened them
+@pytest.fixture(scope="session")
+def client(app):
+    from fastapi.testclient import TestClient
+    with TestClient(app) as client:
+        yield client
+
+
+def register(client, name: str) -> SimpleNamespace:
+    email = f"{name}@example.com"
+    res = client.post("/users/register", json={"name": name.title(), "email": email, "password": PASSWORD})
+    assert res.status_code == 200, res.text
+    login = client.post("/users/login", data={"username": email, "password": PASSWORD}).json()
+    return SimpleNamespace(id=login["user_id"], email=email,
+                           headers={"Authorization": f"Bearer {login['access_token']}"})
+
+
+# Two users and RECIPES recipes created by them (all titled "Chicken ...", so
+# searches return full pages); alice has FAVORITES of them as favorites
+@pytest.fixture(scope="session")
+def catalog(client):
+    from backend import models
+    from backend.database import SessionLocal
+
+    alice, bob = register(client, "alice"), register(client, "bob")
+    with SessionLocal() as db:
+        recipes = [
+            models.Recipes(
+                title=f"Chicken and rice {i}",
+                ingredients=["1 chicken breast", "2 cups rice", f"{i} cloves garlic"],
+                steps="Cook the chicken, then the rice.",
+                created_by=(alice if i % 2 else bob).id,
+            )
+            for i in range(1, RECIPES + 1)
+        ]
+        db.add_all(recipes)
+        db.flush()
+        db.add_all(models.Favorites(user_id=alice.id, recipe_id=r.id) for r in recipes[:FAVORITES])
+        db.commit()
+        recipe_ids = [r.id for r in recipes]
+
+    return SimpleNamespace(alice=alice, bob=bob, recipe_ids=recipe_ids)
+
+
+# with count_statements() as statements: ... -> the SQL run on both engines
+@pytest.fixture
+def count_statements(app):
+    from sqlalchemy import event
+    from backend.database import async_engine, engine
+
+    @contextmanager
+    def counting():
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engines = (engine, async_engine.sync_engine)
+        for e in engines:
+            event.listen(e, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            for e in engines:
+                event.remove(e, "before_cursor_execute", record)
+
+    return counting
+
+
+# The listing routes without the recipe cache (backend/recipe_cache.py)
+@pytest.fixture
+def uncached_listings(monkeypatch):
+    from backend import recipe_cache
+    monkeypatch.setattr(recipe_cache, "RECIPE_CACHE_PAGES", 0)
@@ -0,0 +1,105 @@
+# backend/cache.py: TTL and LRU eviction, single-flight computation (no database)
+
+import asyncio
+
+import pytest
+
+from backend import cache
+from backend.cache import Cache, MemoryBackend
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_entries_expire_after_ttl(clock):
+    backend = MemoryBackend()
+    backend.set("a", 1, ttl=10)
+    clock[0] += 9.9
+    assert backend.get("a") == 1
+    clock[0] += 0.2
+    assert backend.get("a") is None
+    assert len(backend) == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    backend = MemoryBackend(max_entries=2)
+    backend.set("a", 1, ttl=60)
+    backend.set("b", 2, ttl=60)
+    assert backend.get("a") == 1  # b is now the least recently used
+    backend.set("c", 3, ttl=60)
+    assert (backend.get("a"), backend.get("b"), backend.get("c")) == (1, None, 3)
+
+
+def test_concurrent_callers_compute_once():
+    recipes = Cache("test", MemoryBackend(), ttl=60)
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"recipes": ["soup"]}
+
+    async def main():
+        return await asyncio.gather(*(recipes.aget_or_compute("eggs", compute) for _ in range(10)))
+
+    results = asyncio.run(main())
+    assert calls == 1
+    assert results == [{"recipes": ["soup"]}] * 10
+    assert recipes.coalesced == 9
+    assert recipes.get("eggs") == {"recipes": ["soup"]}
+
+
+def test_cancelled_caller_does_not_cancel_the_computation():
+    recipes = Cache("test", MemoryBackend(), ttl=60)
+
+    async def compute():
+        await asyncio.sleep(0.01)
+        return "soup"
+
+    async def main():
+        first = asyncio.ensure_future(recipes.aget_or_compute("eggs", compute))
+        second = asyncio.ensure_future(recipes.aget_or_compute("eggs", compute))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == "soup"
+    assert recipes.get("eggs") == "soup"
+
+
+def test_errors_are_not_cached():
+    recipes = Cache("test", MemoryBackend(), ttl=60)
+
+    async def failing():
+        raise RuntimeError("upstream down")
+
+    async def compute():
+        return "soup"
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(recipes.aget_or_compute("eggs", failing))
+    assert asyncio.run(recipes.aget_or_compute("eggs", compute)) == "soup"
+
+
+def test_invalidate_drops_an_in_flight_result():
+    recipes = Cache("test", MemoryBackend(), ttl=60)
+
+    async def compute():
+        await asyncio.sleep(0.01)
+        return "stale"
+
+    async def main():
+        task = asyncio.ensure_future(recipes.aget_or_compute("eggs", compute))
+        await asyncio.sleep(0)
+        recipes.invalidate("eggs")  # the data changed while it was being computed
+        value = await task
+        await asyncio.sleep(0)  # let the done callbacks run
+        return value
+
+    assert asyncio.run(main()) == "stale"
+    assert recipes.get("eggs") is None
@@ -0,0 +1,62 @@
+# Multi-get (/recipes/batch) and the NDJSON exports
+
+import json
+
+import pytest
+
+
+def ndjson(client, path: str, headers: dict) -> list[dict]:
+    res = client.get(path, headers=headers)
+    assert res.status_code == 200, res.text
+    assert res.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in res.text.splitlines()]
+
+
+def test_batch_keeps_order_and_reports_missing(client, catalog):
+    a, b, c = catalog.recipe_ids[0], catalog.recipe_ids[59], catalog.recipe_ids[30]
+    missing = max(catalog.recipe_ids) + 10_000
+    res = client.get("/recipes/batch", headers=catalog.alice.headers,
+                     params={"ids": [f"{b},{missing}", str(a), f"{c},{b}"]})
+    assert res.status_code == 200, res.text
+    body = res.json()
+    assert [r["id"] for r in body["recipes"]] == [b, a, c]  # duplicates once, in the order asked for
+    assert body["missing"] == [missing]
+    assert [r["is_favorite"] for r in body["recipes"]] == [False, True, True]  # alice has the first 55
+    assert body["recipes"][0]["ingredients"]  # fields=full by default
+
+    summary = client.get("/recipes/batch", headers=catalog.alice.headers, params={"ids": a, "fields": "summary"})
+    assert "ingredients" not in summary.json()["recipes"][0]
+
+
+@pytest.mark.parametrize("ids", ["1,abc", "1.5", "-"])
+def test_batch_rejects_bad_ids(client, catalog, ids):
+    res = client.get("/recipes/batch", headers=catalog.alice.headers, params={"ids": ids})
+    assert res.status_code == 400
+    assert res.json()["detail"] == "ids must be integers"
+
+
+def test_batch_rejects_too_many_ids(client, catalog):
+    from backend.routes.recipes import RECIPE_BATCH_MAX_IDS
+
+    ids = ",".join(str(i) for i in range(1, RECIPE_BATCH_MAX_IDS + 2))
+    assert client.get("/recipes/batch", headers=catalog.alice.headers, params={"ids": ids}).status_code == 400
+
+
+def test_recipe_export_favorite_flags(client, catalog):
+    favorites = set(catalog.recipe_ids[:55])
+    for user, expected in ((catalog.alice, favorites), (catalog.bob, set())):
+        recipes = ndjson(client, "/recipes/export", user.headers)
+        ids = [r["id"] for r in recipes]
+        assert ids == sorted(ids) and set(catalog.recipe_ids) <= set(ids)
+        flagged = {r["id"] for r in recipes if r["is_favorite"] and r["is_favourite"]}
+        assert flagged & set(catalog.recipe_ids) == expected
+
+
+def test_favorites_export(client, catalog):
+    recipes = ndjson(client, "/favorites/export", catalog.alice.headers)
+    ids = [r["id"] for r in recipes]
+    assert ids == sorted(ids)
+    assert set(catalog.recipe_ids[:55]) <= set(ids)
+    assert not set(catalog.recipe_ids[55:]) & set(ids)
+    assert all(r["is_favorite"] and r["is_favourite"] for r in recipes)
+    assert ndjson(client, "/favorites/export", catalog.bob.headers) == []
@@ -0,0 +1,29 @@
+# ETags and conditional GETs on compressed and uncompressed responses
+
+
+def test_etag_is_weak_across_encodings(client, catalog):
+    headers = catalog.alice.headers
+    params = {"page_size": 50, "fields": "full"}  # big enough to be compressed
+
+    gzipped = client.get("/recipes/", headers={**headers, "Accept-Encoding": "gzip"}, params=params)
+    identity = client.get("/recipes/", headers={**headers, "Accept-Encoding": "identity"}, params=params)
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert "content-encoding" not in identity.headers
+
+    etag = identity.headers["etag"]
+    assert etag.startswith('W/"')
+    assert gzipped.headers["etag"] == etag
+
+    for encoding in ("gzip", "identity"):
+        res = client.get("/recipes/", params=params,
+                         headers={**headers, "Accept-Encoding": encoding, "If-None-Match": etag})
+        assert res.status_code == 304
+        assert res.headers["etag"] == etag
+
+
+def test_exports_are_not_compressed(client, catalog):
+    for path in ("/recipes/export", "/favorites/export"):
+        res = client.get(path, headers={**catalog.alice.headers, "Accept-Encoding": "gzip, br"})
+        assert res.status_code == 200, res.text
+        assert len(res.content) > 1024
+        assert "content-encoding" not in res.headers
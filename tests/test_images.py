@@ -0,0 +1,36 @@
+# Image variants: images that can't be resized fall back to the original
+
+import asyncio
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from PIL import Image
+
+from backend import images
+
+
+@pytest.fixture
+def image_dirs(tmp_path, monkeypatch):
+    monkeypatch.setattr(images, "IMAGE_DIR", str(tmp_path))
+    monkeypatch.setattr(images, "VARIANT_DIR", str(tmp_path / "variants"))
+    yield tmp_path
+    images.shutdown()
+
+
+def test_corrupt_image_falls_back_to_original(image_dirs):
+    source = image_dirs / "corrupt.jpg"
+    source.write_bytes(b"not a jpeg")
+    assert asyncio.run(images.ensure_variant(160, "corrupt", "webp")) == str(source)
+
+
+def test_decompression_bomb_is_skipped(image_dirs, monkeypatch):
+    Image.new("RGB", (64, 64)).save(image_dirs / "bomb.png")
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 100)  # 4096 pixels is over twice the limit
+    assert images.generate_all(str(image_dirs / "bomb.png")) == 0
+
+
+def test_broken_pool_is_replaced(image_dirs):
+    with pytest.raises(BrokenProcessPool):
+        images.submit(os._exit, 1).result()
+    assert images.submit(abs, -1).result() == 1
@@ -0,0 +1,26 @@
+import pytest
+
+from backend.ingredients import ingredient_terms, normalize_ingredient
+
+
+@pytest.mark.parametrize("line, terms", [
+    ("2 large eggs, lightly beaten", ["egg"]),
+    ("1 cup all-purpose flour (spooned)", ["all-purpose", "flour"]),
+    ("3 tomatoes", ["tomato"]),
+    ("1/2 cup baker's sugar", ["baker", "sugar"]),
+    ("2 tbsp cooks' choice olive oil", ["cook", "choice", "olive", "oil"]),
+    ("Kosher salt", []),
+    ("Salt and freshly ground black pepper", []),
+    ("1 cup ice water", []),
+    ("1 red bell pepper, seeded", ["red", "bell", "pepper"]),
+    ("1 pint vanilla ice cream", ["vanilla", "ice", "cream"]),
+    ("1 can black beans, drained", ["black", "bean"]),
+])
+def test_normalize_ingredient(line, terms):
+    assert normalize_ingredient(line) == terms
+
+
+def test_ingredient_terms_sorted_and_deduplicated():
+    lines = ["2 eggs", "1 egg yolk", "Salt", "1/4 cup whole milk"]
+    assert ingredient_terms(lines) == ["egg", "milk", "yolk"]
+    assert ingredient_terms(None) == []
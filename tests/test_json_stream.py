@@ -0,0 +1,65 @@
+# backend/json_stream.py: fields of a streamed recipe, whatever the chunking (no database)
+
+import json
+
+import pytest
+
+from backend.json_stream import RecipeStreamParser
+
+RECIPE = {
+    "title": 'Mom\'s "best" {stew}, v2',
+    "ingredients": ["1 cup stock [hot]", "salt\\pepper", "2 crème fraîche"],
+    "steps": "Simmer.\nServe, with \"bread\" \\ rice.\té",
+}
+ANSWER = json.dumps([RECIPE, {"title": "ignored"}])
+
+
+def parse(chunks) -> tuple[dict, list[str]]:
+    parser = RecipeStreamParser()
+    order = []
+    for chunk in chunks:
+        order += [key for key, _ in parser.feed(chunk)]
+    return parser.result(), order
+
+
+def test_whole_answer():
+    assert parse([ANSWER]) == (RECIPE, ["title", "ingredients", "steps"])
+
+
+def test_one_character_at_a_time():
+    assert parse(ANSWER) == (RECIPE, ["title", "ingredients", "steps"])
+
+
+@pytest.mark.parametrize("split", range(1, len(ANSWER)))
+def test_every_split_point(split):
+    assert parse([ANSWER[:split], ANSWER[split:]])[0] == RECIPE
+
+
+@pytest.mark.parametrize("answer", [
+    json.dumps([RECIPE], ensure_ascii=False),
+    json.dumps([RECIPE], indent=2),
+])
+def test_escapes_and_whitespace(answer):
+    chunks = answer.split("\\")  # every escape split right after its backslash
+    chunks = [chunk + "\\" for chunk in chunks[:-1]] + chunks[-1:]
+    assert parse(chunks)[0] == RECIPE
+
+
+def test_fields_are_returned_as_soon_as_they_are_complete():
+    parser = RecipeStreamParser()
+    assert parser.feed('[{"title": "Soup", "ingr') == [("title", "Soup")]
+    assert parser.feed('edients": ["1 leek"]') == []
+    assert parser.feed(', "steps"') == [("ingredients", ["1 leek"])]
+    assert parser.feed(': "Boil."}') == [("steps", "Boil.")]
+
+
+def test_incomplete_answer():
+    parser = RecipeStreamParser()
+    parser.feed('[{"title": "Soup", "steps": "Bo')
+    with pytest.raises(ValueError):
+        parser.result()
+
+
+def test_invalid_value():
+    with pytest.raises(ValueError):
+        RecipeStreamParser().feed('[{"title": Soup, "steps": "Boil."}]')
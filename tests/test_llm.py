@@ -0,0 +1,83 @@
+# backend/llm.py: load shedding (503) and timeouts (504) around the upstream API, no network
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from backend import llm
+from backend.llm import UpstreamLimiter
+
+
+# Stands in for AsyncInferenceClient; create() never answers
+def hanging_client() -> SimpleNamespace:
+    async def create(**params):
+        await asyncio.sleep(3600)
+
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    limiter = UpstreamLimiter(limit=1, max_queue=1)
+    monkeypatch.setattr(llm, "upstream", limiter)
+    monkeypatch.setattr(llm, "client", hanging_client())
+    monkeypatch.setattr(llm, "LLM_TIMEOUT", 0.05)
+    return limiter
+
+
+def test_full_queue_is_shed_with_503():
+    limiter = UpstreamLimiter(limit=1, max_queue=1)
+
+    async def main():
+        await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        assert (limiter.active, limiter.waiting) == (1, 1)
+
+        with pytest.raises(HTTPException) as exc:
+            await limiter.acquire()
+        assert exc.value.status_code == 503
+        assert exc.value.headers["Retry-After"]
+
+        limiter.release()
+        await waiter
+        limiter.release()
+
+    asyncio.run(main())
+    assert limiter.rejected == 1
+    assert (limiter.active, limiter.waiting) == (0, 0)
+
+
+def test_slow_completion_times_out_with_504(limiter):
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(llm.complete("eggs"))
+    assert exc.value.status_code == 504
+    assert limiter.timeouts == 1
+    assert limiter.active == 0  # the slot was given back
+
+
+def test_waiting_for_a_slot_counts_towards_the_timeout(limiter):
+    async def main():
+        await limiter.acquire()  # the only slot is taken for longer than LLM_TIMEOUT
+        try:
+            await llm.complete("eggs")
+        finally:
+            limiter.release()
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(main())
+    assert exc.value.status_code == 504
+    assert (limiter.active, limiter.waiting) == (0, 0)
+
+
+def test_slow_stream_times_out_with_504(limiter):
+    async def main():
+        return [chunk async for chunk in llm.stream("eggs")]
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(main())
+    assert exc.value.status_code == 504
+    assert limiter.timeouts == 1
+    assert limiter.active == 0
@@ -0,0 +1,42 @@
+# Login and sign-up hash passwords without holding a database connection
+
+from passlib.context import CryptContext
+
+from tests.conftest import PASSWORD, register
+
+
+def test_password_hashing_holds_no_connection(client, monkeypatch):
+    from backend import passwords
+    from backend.database import async_engine
+
+    checked_out = []
+    hash_password, verify_password = passwords.hash_password, passwords.verify_password
+
+    async def hashing(password):
+        checked_out.append(async_engine.pool.checkedout())
+        return await hash_password(password)
+
+    async def verifying(plain, hashed):
+        checked_out.append(async_engine.pool.checkedout())
+        return await verify_password(plain, hashed)
+
+    monkeypatch.setattr(passwords, "hash_password", hashing)
+    monkeypatch.setattr(passwords, "verify_password", verifying)
+    register(client, "carol")
+    assert checked_out == [0, 0]
+
+
+def test_login_rehashes_with_new_cost(client, monkeypatch):
+    from sqlalchemy import select
+    from backend import models, passwords
+    from backend.database import SessionLocal
+
+    dave = register(client, "dave")
+    monkeypatch.setattr(passwords, "pwd_context", CryptContext(schemes=["bcrypt"], bcrypt__rounds=5))
+    res = client.post("/users/login", data={"username": dave.email, "password": PASSWORD})
+    assert res.status_code == 200, res.text
+
+    with SessionLocal() as db:
+        stored = db.execute(select(models.Users.password_hash).where(models.Users.id == dave.id)).scalar_one()
+    assert stored.startswith("$2b$05$")
+    assert client.post("/users/login", data={"username": dave.email, "password": PASSWORD}).status_code == 200
@@ -0,0 +1,67 @@
+# Keyset cursors (?after=) and count modes on the paginated listings
+
+import pytest
+
+from backend.pagination import encode_cursor
+
+# path -> its query (httpx drops a query string in the path when params are given)
+LISTINGS = {"/recipes/": {}, "/recipes/search": {"q": "chicken"}}
+
+
+def walk(client, path: str, headers: dict, **params) -> list[int]:
+    ids, after = [], None
+    while True:
+        cursor = {"after": after} if after else {}
+        res = client.get(path, headers=headers, params={**LISTINGS[path], **params, **cursor})
+        assert res.status_code == 200, res.text
+        body = res.json()
+        ids += [r["id"] for r in body["recipes"]]
+        after = body["next_cursor"]
+        if after is None:
+            return ids
+
+
+@pytest.mark.parametrize("path", LISTINGS)
+def test_cursor_pages_do_not_overlap(client, catalog, uncached_listings, path):
+    headers = catalog.alice.headers
+    everything = client.get(path, headers=headers, params={**LISTINGS[path], "page_size": 100}).json()
+
+    ids = walk(client, path, headers, page_size=7)
+    assert len(ids) == len(set(ids)) == everything["total"]
+    assert ids == [r["id"] for r in everything["recipes"]]  # same order as offset pages
+    assert set(catalog.recipe_ids) <= set(ids)
+
+
+@pytest.mark.parametrize("path", LISTINGS)
+@pytest.mark.parametrize("after", ["not-a-cursor", encode_cursor({"id": "7"}), encode_cursor([1, 2]),
+                                   encode_cursor({"id": 7, "rank": "high"})])
+def test_invalid_cursor(client, catalog, path, after):
+    res = client.get(path, headers=catalog.alice.headers, params={**LISTINGS[path], "after": after})
+    assert res.status_code == 400
+    assert res.json()["detail"] == "Invalid cursor"
+
+
+def test_search_cursor_needs_rank(client, catalog):
+    res = client.get("/recipes/search", headers=catalog.alice.headers,
+                     params={"q": "chicken", "after": encode_cursor({"id": 7})})
+    assert res.status_code == 400
+
+
+@pytest.mark.parametrize("path", LISTINGS)
+def test_count_modes(client, catalog, uncached_listings, path):
+    def page(count: str) -> dict:
+        res = client.get(path, headers=catalog.alice.headers,
+                         params={**LISTINGS[path], "page_size": 10, "count": count})
+        assert res.status_code == 200, res.text
+        return res.json()
+
+    exact, estimated, none = page("exact"), page("estimated"), page("none")
+    assert exact["total"] >= len(catalog.recipe_ids)
+    assert exact["total_pages"] == -(-exact["total"] // 10)
+
+    assert isinstance(estimated["total"], int) and estimated["total"] > 0
+    assert estimated["total_pages"] == -(-estimated["total"] // 10)
+
+    assert none["total"] is None and none["total_pages"] is None
+    assert exact["recipes"] == estimated["recipes"] == none["recipes"]
+    assert none["next_cursor"] is not None
@@ -0,0 +1,66 @@
+# recipes.favorite_count follows favorite adds/removes, and /recipes/popular is ordered by it
+
+from tests.conftest import register
+
+
+def popular(client, headers, **params) -> dict:
+    res = client.get("/recipes/popular", headers=headers, params=params)
+    assert res.status_code == 200, res.text
+    return res.json()
+
+
+def test_favorite_count_and_popular_order(client, catalog):
+    alice, bob = catalog.alice, catalog.bob
+    grace = register(client, "grace")
+    ids = []
+    for title in ("Popular test pie", "Popular test tart", "Popular test flan"):
+        res = client.post("/recipes/", headers=alice.headers, data={"title": title, "ingredients": ["1 egg"],
+                                                                    "steps": "Bake."})
+        assert res.status_code == 200, res.text
+        ids.append(res.json()["id"])
+    pie, tart, flan = ids
+
+    try:
+        for user, recipe_ids in ((alice, ids), (bob, [pie, tart]), (grace, [pie])):
+            for recipe_id in recipe_ids:
+                assert client.post(f"/favorites/{recipe_id}", headers=user.headers).status_code == 200
+        assert client.post(f"/favorites/{pie}", headers=bob.headers).status_code == 400  # counted once
+
+        top = popular(client, bob.headers, page_size=3)["recipes"]
+        assert [(r["id"], r["favorite_count"]) for r in top] == [(pie, 3), (tart, 2), (flan, 1)]
+        assert [r["is_favorite"] for r in top] == [True, True, False]  # bob's own flags
+
+        assert client.delete(f"/favorites/{pie}", headers=grace.headers).status_code == 200
+        assert client.delete(f"/favorites/{pie}", headers=grace.headers).status_code == 404
+        top = popular(client, bob.headers, page_size=3)["recipes"]
+        # ties are broken by id, newest first
+        assert [(r["id"], r["favorite_count"]) for r in top] == [(tart, 2), (pie, 2), (flan, 1)]
+    finally:
+        for recipe_id in ids:
+            client.delete(f"/recipes/id/{recipe_id}", headers=alice.headers)
+
+
+def test_popular_cursor_pages(client, catalog):
+    headers = catalog.alice.headers
+    first = popular(client, headers, page_size=100)["recipes"]
+
+    walked, after = [], None
+    while True:
+        body = popular(client, headers, page_size=7, **({"after": after} if after else {}))
+        walked += body["recipes"]
+        after = body["next_cursor"]
+        if after is None:
+            break
+
+    keys = [(r["favorite_count"], r["id"]) for r in walked]
+    assert keys == sorted(keys, reverse=True)
+    assert len({r["id"] for r in walked}) == len(walked)
+    assert [r["id"] for r in walked[:100]] == [r["id"] for r in first]
+    assert set(catalog.recipe_ids) <= {r["id"] for r in walked}
+
+
+def test_popular_cursor_needs_rank(client, catalog):
+    from backend.pagination import encode_cursor
+
+    res = client.get("/recipes/popular", headers=catalog.alice.headers, params={"after": encode_cursor({"id": 5})})
+    assert res.status_code == 400
@@ -0,0 +1,72 @@
+# SQL statements per request: listing pages must cost the same number of
+# queries whatever their size (no per-row favorite or creator lookups)
+
+from urllib.parse import parse_qsl
+
+import pytest
+
+LISTINGS = ["/recipes/", "/recipes/search?q=chicken"]
+
+
+def statements_for(client, count_statements, path: str, headers: dict, **params) -> int:
+    path, _, query = path.partition("?")  # httpx drops a query string in the path when params are given
+    params = {**dict(parse_qsl(query)), **params}
+    client.get(path, headers=headers, params=params)  # warm the user cache
+    with count_statements() as statements:
+        res = client.get(path, headers=headers, params=params)
+    assert res.status_code == 200, res.text
+    assert len(res.json()["recipes"]) == params.get("page_size", 10)
+    return len(statements)
+
+
+@pytest.mark.parametrize("path", LISTINGS)
+def test_statements_do_not_grow_with_page_size(client, catalog, count_statements, uncached_listings, path):
+    headers = catalog.alice.headers
+    small = statements_for(client, count_statements, path, headers, page_size=5)
+    large = statements_for(client, count_statements, path, headers, page_size=50)
+    assert small == large
+
+
+# Statements per endpoint, with the user already cached (get_current_user)
+EXPECTED = {
+    "/recipes/": 3,                 # page, count, favorite flags
+    "/recipes/search?q=chicken": 3,  # page, count, favorite flags
+    "/favorites/": 2,               # count, page (every row is a favorite)
+}
+
+
+@pytest.mark.parametrize("path", EXPECTED)
+def test_listing_statements(client, catalog, count_statements, uncached_listings, path):
+    assert statements_for(client, count_statements, path, catalog.alice.headers) == EXPECTED[path]
+
+
+def test_match_statements(client, catalog, count_statements):
+    headers = catalog.alice.headers
+    body = {"ingredients": ["chicken", "rice"]}
+    client.post("/recipes/match", json=body, headers=headers)
+    with count_statements() as statements:
+        res = client.post("/recipes/match", json=body, headers=headers)
+    assert res.status_code == 200, res.text
+    assert len(res.json()["recipes"]) == 10
+    assert len(statements) == 2  # matches with their creators, favorite flags
+
+
+def test_recipe_statements(client, catalog, count_statements):
+    from backend import recipe_cache
+
+    headers = catalog.alice.headers
+    recipe_id = catalog.recipe_ids[0]
+    path = f"/recipes/id/{recipe_id}"
+    client.get(path, headers=headers)
+    recipe_cache.documents.delete(f"doc:{recipe_id}")
+    recipe_cache.favorites.delete(str(catalog.alice.id))
+
+    with count_statements() as cold:
+        res = client.get(path, headers=headers)
+    assert res.status_code == 200, res.text
+    assert res.json()["created_by_name"] == "Alice"
+    assert len(cold) == 2  # the recipe with its creator, the favorite ids
+
+    with count_statements() as warm:
+        assert client.get(path, headers=headers).status_code == 200
+    assert len(warm) == 0
@@ -0,0 +1,79 @@
+# Cached reads (backend/recipe_cache.py) must reflect writes on the next request
+
+
+def test_update_and_delete_reach_cached_recipe(client, catalog):
+    headers = catalog.alice.headers
+    res = client.post("/recipes/", headers=headers, data={
+        "title": "Cache test soup",
+        "ingredients": ["1 onion", "2 cups stock"],
+        "steps": "Simmer.",
+    })
+    assert res.status_code == 200, res.text
+    recipe_id = res.json()["id"]
+    path = f"/recipes/id/{recipe_id}"
+
+    first = client.get(path, headers=headers)
+    assert first.json()["title"] == "Cache test soup"
+    assert client.get(path, headers=headers).headers["etag"] == first.headers["etag"]  # from the cache
+
+    res = client.put(path, headers=headers, json={"title": "Cache test stew"})
+    assert res.status_code == 200, res.text
+    updated = client.get(path, headers=headers)
+    assert updated.json()["title"] == "Cache test stew"
+    assert updated.headers["etag"] != first.headers["etag"]
+    assert client.get(path, headers={**headers, "If-None-Match": first.headers["etag"]}).status_code == 200
+
+    listing = client.get("/recipes/", headers=headers, params={"page_size": 100}).json()
+    assert "Cache test stew" in [r["title"] for r in listing["recipes"]]
+
+    assert client.delete(path, headers=headers).status_code == 200
+    assert client.get(path, headers=headers).status_code == 404
+    listing = client.get("/recipes/", headers=headers, params={"page_size": 100}).json()
+    assert recipe_id not in [r["id"] for r in listing["recipes"]]
+
+
+def test_favorite_toggle_reaches_cached_listing(client, catalog):
+    headers = catalog.bob.headers  # no favorites yet
+    params = {"page_size": 10}
+
+    def first_page():
+        res = client.get("/recipes/", headers=headers, params=params)
+        assert res.status_code == 200, res.text
+        return res.headers["etag"], res.json()["recipes"]
+
+    before_etag, recipes = first_page()
+    recipe_id = recipes[0]["id"]
+    assert not recipes[0]["is_favorite"]
+
+    assert client.post(f"/favorites/{recipe_id}", headers=headers).status_code == 200
+    added_etag, recipes = first_page()
+    assert recipes[0]["id"] == recipe_id and recipes[0]["is_favorite"]
+    assert added_etag != before_etag
+    assert client.get("/recipes/", headers={**headers, "If-None-Match": before_etag},
+                      params=params).status_code == 200
+
+    assert client.delete(f"/favorites/{recipe_id}", headers=headers).status_code == 200
+    removed_etag, recipes = first_page()
+    assert not recipes[0]["is_favorite"]
+    assert removed_etag == before_etag
+
+
+def test_favorite_toggle_reaches_other_workers_through_a_shared_backend(client, catalog):
+    from backend import recipe_cache
+    from backend.cache import Cache
+
+    # Another worker's cache on the same backend, as with RECIPE_CACHE_URL=redis://...
+    other_worker = Cache("favorite_ids", recipe_cache.favorites.backend, ttl=recipe_cache.RECIPE_FAVORITES_TTL)
+    headers, key = catalog.bob.headers, str(catalog.bob.id)
+    recipe_id = catalog.recipe_ids[3]
+
+    client.get(f"/recipes/id/{recipe_id}", headers=headers)  # fills bob's overlay
+    assert recipe_id not in other_worker.get(key)
+
+    assert client.post(f"/favorites/{recipe_id}", headers=headers).status_code == 200
+    assert other_worker.get(key) is None  # invalidated for every worker, not just this one
+    assert client.get(f"/recipes/id/{recipe_id}", headers=headers).json()["is_favorite"]
+    assert recipe_id in other_worker.get(key)
+
+    assert client.delete(f"/favorites/{recipe_id}", headers=headers).status_code == 200
+    assert other_worker.get(key) is None
@@ -0,0 +1,29 @@
+# Recipe documents returned by write and match routes have the same shape as get_recipe
+
+
+def test_match_sets_both_favorite_flags(client, catalog):
+    res = client.post("/recipes/match", headers=catalog.alice.headers,
+                      json={"ingredients": ["chicken breast", "rice"]}, params={"limit": 50})
+    assert res.status_code == 200, res.text
+    recipes = res.json()["recipes"]
+    assert recipes
+    favorites = set(catalog.recipe_ids[:55])
+    for recipe in recipes:
+        assert recipe["is_favourite"] == recipe["is_favorite"] == (recipe["id"] in favorites)
+        assert recipe["created_by_name"] in ("Alice", "Bob")
+        assert sorted(recipe["matched_ingredients"]) == res.json()["ingredients"]
+        assert "ingredient_terms" not in recipe
+
+
+def test_update_returns_recipe_document(client, catalog):
+    headers = catalog.alice.headers
+    recipe_id = catalog.recipe_ids[0]  # alice's, and one of her favorites
+    path = f"/recipes/id/{recipe_id}"
+    title = client.get(path, headers=headers).json()["title"]
+
+    res = client.put(path, headers=headers, json={"title": title})
+    assert res.status_code == 200, res.text
+    assert res.json() == client.get(path, headers=headers).json()
+    assert res.json()["is_favorite"]
+    for key in ("ingredient_terms", "favorite_count", "updated_at"):
+        assert key not in res.json()
@@ -0,0 +1,18 @@
+# Recipe search filters
+
+
+def search(client, catalog, **params) -> dict:
+    res = client.get("/recipes/search", headers=catalog.alice.headers, params={"page_size": 100, **params})
+    assert res.status_code == 200, res.text
+    return res.json()
+
+
+def test_ingredient_filter(client, catalog):
+    body = search(client, catalog, ingredient=["garlic", "2 cups of rice"])
+    assert {r["id"] for r in body["recipes"]} >= set(catalog.recipe_ids)
+
+
+def test_staple_only_ingredient_matches_nothing(client, catalog):
+    for ingredient in (["salt"], ["Kosher salt", "water"], [" "]):
+        body = search(client, catalog, ingredient=ingredient)
+        assert body["recipes"] == [] and body["total"] == 0
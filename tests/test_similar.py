@@ -0,0 +1,67 @@
+# Precomputed similar recipes (backend/recommendations.py), kept up to date on writes
+
+from concurrent.futures import ThreadPoolExecutor
+
+
+def create(client, headers, title: str, ingredients: list[str]) -> int:
+    res = client.post("/recipes/", headers=headers, data={"title": title, "ingredients": ingredients,
+                                                          "steps": "Cook."})
+    assert res.status_code == 200, res.text
+    return res.json()["id"]
+
+
+def similar_ids(client, headers, recipe_id: int) -> list[int]:
+    res = client.get(f"/recipes/id/{recipe_id}/similar", headers=headers)
+    assert res.status_code == 200, res.text
+    recipes = res.json()["recipes"]
+    assert all(r["similarity"] > 0 for r in recipes)
+    assert [r["similarity"] for r in recipes] == sorted((r["similarity"] for r in recipes), reverse=True)
+    return [r["id"] for r in recipes]
+
+
+def test_similar_recipes_follow_creates_and_updates(client, catalog):
+    headers = catalog.alice.headers
+    soup = create(client, headers, "Similar test soup", ["1 cup lentils", "2 carrots", "1 stalk celery"])
+    stew = create(client, headers, "Similar test stew", ["2 cups lentils", "3 carrots", "1 parsnip"])
+    cake = create(client, headers, "Similar test cake", ["200 g dark chocolate", "1 cup hazelnuts"])
+    try:
+        # refresh_recipe runs as a background task of each create
+        assert similar_ids(client, headers, soup) == [stew]
+        assert similar_ids(client, headers, stew) == [soup]
+        assert similar_ids(client, headers, cake) == []
+
+        res = client.put(f"/recipes/id/{stew}", headers=headers,
+                         json={"ingredients": ["100 g dark chocolate", "2 cups hazelnuts"]})
+        assert res.status_code == 200, res.text
+        assert similar_ids(client, headers, stew) == [cake]
+        assert similar_ids(client, headers, cake) == [stew]
+        assert stew not in similar_ids(client, headers, soup)
+    finally:
+        for recipe_id in (soup, stew, cake):
+            client.delete(f"/recipes/id/{recipe_id}", headers=headers)
+
+
+def test_concurrent_refreshes(client, catalog):
+    from backend import recommendations
+
+    headers = catalog.alice.headers
+    ids = [create(client, headers, f"Similar test tart {i}", ["3 plums", "1 cup almonds", f"{i} figs"])
+           for i in range(3)]
+    try:
+        with ThreadPoolExecutor(6) as pool:
+            list(pool.map(recommendations.refresh_recipe, ids * 4))  # raises on a duplicate key
+        for recipe_id in ids:
+            assert sorted(similar_ids(client, headers, recipe_id)) == sorted(set(ids) - {recipe_id})
+    finally:
+        for recipe_id in ids:
+            client.delete(f"/recipes/id/{recipe_id}", headers=headers)
+
+
+def test_candidates_come_from_selective_terms(monkeypatch):
+    from backend import recommendations
+
+    monkeypatch.setattr(recommendations, "SIMILAR_MAX_TERM_DF", 100)
+    df = {"onion": 5000, "garlic": 4000, "saffron": 12}
+    assert recommendations.selective_terms(["onion", "saffron", "yuzu"], df) == ["saffron", "yuzu"]
+    assert recommendations.selective_terms(["onion", "garlic"], df) == ["garlic"]
+    assert recommendations.selective_terms([], df) == []
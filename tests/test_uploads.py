@@ -0,0 +1,57 @@
+# Recipe image uploads: size limits on the multipart body, content-addressed files
+
+import hashlib
+import os
+
+import pytest
+
+
+@pytest.fixture
+def image_dir(tmp_path, monkeypatch):
+    from backend import uploads
+    monkeypatch.setattr(uploads, "IMAGE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def recipe_form(title: str, steps: str = "Bake.") -> dict:
+    return {"title": title, "ingredients": ["1 cup flour"], "steps": steps}
+
+
+def test_upload_is_stored_under_its_hash(client, catalog, image_dir):
+    image = b"\x89PNG\r\n\x1a\n" + os.urandom(2048)
+    res = client.post("/recipes/", headers=catalog.alice.headers, data=recipe_form("Upload test bread"),
+                      files={"file": ("bread.png", image, "image/png")})
+    assert res.status_code == 200, res.text
+
+    name = hashlib.sha256(image).hexdigest() + ".png"
+    assert res.json()["image_url"] == "/images/" + name
+    assert os.listdir(image_dir) == [name]
+    assert client.delete(f"/recipes/id/{res.json()['id']}", headers=catalog.alice.headers).status_code == 200
+
+
+def test_oversized_request_rejected_before_parsing(client, catalog, image_dir, monkeypatch):
+    from backend import uploads
+    monkeypatch.setattr(uploads, "MAX_REQUEST_BYTES", 4096)
+
+    res = client.post("/recipes/", headers=catalog.alice.headers, data=recipe_form("Upload test cake"),
+                      files={"file": ("cake.png", os.urandom(8192), "image/png")})
+    assert res.status_code == 413
+    assert os.listdir(image_dir) == []
+
+
+def test_oversized_text_field_rejected(client, catalog, image_dir):
+    from backend import uploads
+
+    steps = "x" * (uploads.MAX_FORM_FIELD_BYTES + 1)
+    res = client.post("/recipes/", headers=catalog.alice.headers, data=recipe_form("Upload test pie", steps),
+                      files={"file": ("pie.png", b"\x89PNG\r\n\x1a\n", "image/png")})
+    assert res.status_code == 400
+    assert os.listdir(image_dir) == []
+
+
+def test_oversized_urlencoded_form_rejected(client, catalog, monkeypatch):
+    from backend import uploads
+    monkeypatch.setattr(uploads, "MAX_REQUEST_BYTES", 4096)
+
+    res = client.post("/recipes/", headers=catalog.alice.headers, data=recipe_form("Upload test tart", "x" * 8192))
+    assert res.status_code == 413